@@ -0,0 +1,5 @@
+"""Controller-level benchmarks against a synthetic local SQLite database.
+
+    python -m benchmarks.run --users 50 --expenses 1000000 --output results.json
+    python -m benchmarks.run --compare results.json
+"""
@@ -0,0 +1,39 @@
+import os
+
+_PLACEHOLDERS = {
+    "SNOWFLAKE_USER": "bench",
+    "SNOWFLAKE_PASSWORD": "bench",
+    "SNOWFLAKE_ACCOUNT": "bench",
+    "SNOWFLAKE_WAREHOUSE": "bench",
+    "SNOWFLAKE_DATABASE": "bench",
+    "SNOWFLAKE_SCHEMA": "bench",
+    "SNOWFLAKE_ROLE": "bench",
+    "JWT_SECRET": "bench",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "PASSWORD_RESET_TOKEN_EXPIRE_MINUTES": "15",
+    "CURRENCY_SYMBOL": "$",
+}
+
+def use_sqlite(path: str):
+    """Point the app's engine and SessionLocal at a SQLite file; call before importing controllers.
+
+    Settings are required at import time, so placeholders fill any the environment lacks.
+    """
+    for name, value in _PLACEHOLDERS.items():
+        os.environ.setdefault(name, value)
+    os.environ.pop("DB_ASYNC_URL", None)
+
+    from sqlalchemy import create_engine, event
+    import config.database as database
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    return engine
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timezone
+from sqlalchemy import event
+
+from benchmarks.env import use_sqlite
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+class Probe:
+    """Counts statements and SQLite VM steps (a proxy for rows scanned) while ``active``.
+
+    The progress handler only goes on connections opened after ``enable``, so timed runs
+    don't pay for it.
+    """
+    STEP_INTERVAL = 100
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.enabled = False
+        self.active = False
+        self.statements = 0
+        self.vm_steps = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "connect", self._install)
+
+    def enable(self):
+        self.enabled = True
+        self.engine.dispose()
+
+    def _statement(self, *_):
+        if self.active:
+            self.statements += 1
+
+    def _install(self, dbapi_connection, _):
+        if self.enabled:
+            dbapi_connection.set_progress_handler(self._step, self.STEP_INTERVAL)
+
+    def _step(self):
+        if self.active:
+            self.vm_steps += self.STEP_INTERVAL
+        return 0
+
+    async def measure(self, call) -> dict:
+        self.statements = self.vm_steps = 0
+        self.active = True
+        try:
+            await call()
+        finally:
+            self.active = False
+        return {"statements": self.statements, "vm_steps": self.vm_steps}
+
+def _scenarios(ctx: dict) -> list[tuple]:
+    from controllers.budget_controller import list_budgets
+    from controllers.category_controller import list_categories
+    from controllers.expense_controller import create_expense, list_expenses, search_expenses
+    from controllers.reports_controller import monthly_reports, monthly_reports_by_category, trend_report
+    from utils.expense_store import expense_store
+    from utils.report_cache import report_cache
+    from utils.responses import dump_json
+
+    user, month = ctx["user"], ctx["month"]
+
+    async def rendered(payload):
+        # Include response encoding, which dominates list endpoints at 100 rows.
+        return dump_json(await payload)
+
+    def cold_reports():
+        report_cache.invalidate(user.id)
+
+    def from_store(call):
+        # The store is off by default; warmup runs make the user hot enough to load.
+        async def run(db):
+            expense_store.enabled = True
+            try:
+                return await call(db)
+            finally:
+                expense_store.enabled = False
+        return run
+
+    # (name, setup run untimed before each call, call)
+    return [
+        ("list_expenses.first_page", None, lambda db: list_expenses(db, user, page=1)),
+        ("list_expenses.page_100_rendered", None, lambda db: rendered(list_expenses(db, user, per_page=100, include_total=False))),
+        ("list_expenses.deep_offset", None, lambda db: list_expenses(db, user, page=ctx["deep_page"])),
+        ("list_expenses.deep_cursor", None, lambda db: list_expenses(db, user, cursor=ctx["deep_cursor"], include_total=False)),
+        ("search_expenses.prefix", None, lambda db: rendered(search_expenses(db, user, "week", include_total=False))),
+        ("search_expenses.two_terms_total", None, lambda db: search_expenses(db, user, "monthly shop")),
+        ("monthly_reports", cold_reports, lambda db: monthly_reports(db, user, month)),
+        ("monthly_reports.cached", None, lambda db: monthly_reports(db, user, month)),
+        ("monthly_reports_by_category", cold_reports, lambda db: monthly_reports_by_category(db, user, month)),
+        ("trend_report.12_months", None, lambda db: trend_report(db, user, ctx["trend_from"], month)),
+        ("monthly_reports.expense_store", cold_reports, from_store(lambda db: monthly_reports(db, user, month))),
+        ("monthly_reports_by_category.expense_store", cold_reports,
+         from_store(lambda db: monthly_reports_by_category(db, user, month))),
+        ("trend_report.12_months.expense_store", None, from_store(lambda db: trend_report(db, user, ctx["trend_from"], month))),
+        ("list_categories", None, lambda db: list_categories(db, user)),
+        ("list_budgets.rendered", None, lambda db: rendered(list_budgets(db, user))),
+        ("create_expense.budget_check", None, lambda db: create_expense(
+            db, user, 12.5, ctx["today"], "benchmark", ctx["budget_category_id"]
+        )),
+    ]
+
+def _context(today: date, deep_page: int, per_page: int = 20) -> dict:
+    from sqlalchemy import func, select
+    from config.database import SessionLocal
+    from controllers.expense_controller import EXPENSE_ORDER
+    from models import Budget, Expense, User
+    from utils.months import month_of, shift_month
+    from utils.pagination import encode_cursor, keyset_order
+
+    month = month_of(today)
+    with SessionLocal() as db:
+        user_id = db.execute(
+            select(Expense.user_id).group_by(Expense.user_id).order_by(func.count().desc()).limit(1) # pylint: disable=not-callable
+        ).scalar_one()
+        user = db.get(User, user_id)
+        rows = db.execute(select(func.count()).select_from(Expense).filter(Expense.user_id == user_id)).scalar_one() # pylint: disable=not-callable
+        deep_page = max(1, min(deep_page, rows // per_page))
+        anchor = db.execute(
+            select(Expense.date, Expense.id).filter(Expense.user_id == user_id)
+            .order_by(*keyset_order(EXPENSE_ORDER)).offset((deep_page - 1) * per_page - 1).limit(1)
+        ).first() if deep_page > 1 else None
+        budget_category_id = db.execute(
+            select(Budget.category_id).filter(Budget.user_id == user_id, Budget.month == month).limit(1)
+        ).scalar()
+        db.expunge(user)
+
+    return {
+        "user": user,
+        "user_expenses": rows,
+        "today": today,
+        "month": month,
+        "trend_from": shift_month(month, -11),
+        "deep_page": deep_page,
+        "deep_cursor": encode_cursor(list(anchor)) if anchor else None,
+        "budget_category_id": budget_category_id,
+    }
+
+async def _run(engine, ctx: dict, iterations: int, warmup: int, only: set[str] | None) -> dict:
+    from config.database import SessionLocal, db_executor
+
+    probe = Probe(engine)
+    scenarios = [scenario for scenario in _scenarios(ctx) if not only or scenario[0] in only]
+
+    async def invoke(setup, call):
+        if setup:
+            setup()
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            await call(db)
+            return time.perf_counter() - started
+
+    results = {}
+    for name, setup, call in scenarios:
+        if name.endswith(".deep_cursor") and not ctx["deep_cursor"]:
+            continue
+        for _ in range(warmup):
+            await invoke(setup, call)
+        samples = [await invoke(setup, call) * 1000 for _ in range(iterations)]
+        results[name] = {
+            "iterations": iterations,
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "p50_ms": round(_percentile(samples, 50), 3),
+            "p95_ms": round(_percentile(samples, 95), 3),
+            "p99_ms": round(_percentile(samples, 99), 3),
+        }
+        print(f"{name:32} p50 {results[name]['p50_ms']:9.3f} ms  p95 {results[name]['p95_ms']:9.3f} ms  "
+              f"p99 {results[name]['p99_ms']:9.3f} ms", file=sys.stderr)
+
+    probe.enable()
+    for name, setup, call in scenarios:
+        if name not in results:
+            continue
+        if setup:
+            setup()
+        with SessionLocal() as db:
+            results[name].update(await probe.measure(lambda: call(db)))
+
+    db_executor.shutdown()
+    return results
+
+def _compare(results: dict, baseline_path: str, threshold: float) -> bool:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressed = False
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"{name:32} new", file=sys.stderr)
+            continue
+        ratio = current["p95_ms"] / previous["p95_ms"] if previous["p95_ms"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressed = "  REGRESSION", True
+        elif ratio < 1 - threshold:
+            flag = "  improved"
+        statements = f"{previous.get('statements')} -> {current.get('statements')} statements"
+        print(f"{name:32} p95 {previous['p95_ms']:9.3f} -> {current['p95_ms']:9.3f} ms ({ratio:5.2f}x), {statements}{flag}",
+              file=sys.stderr)
+    return not regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark controller functions against a synthetic SQLite dataset")
+    parser.add_argument("--db", default="benchmark.db", help="SQLite file; generated if missing or with --rebuild")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the dataset even if the file exists")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=10, help="Categories per user")
+    parser.add_argument("--expenses", type=int, default=200_000)
+    parser.add_argument("--months", type=int, default=36, help="Months of history, weighted towards recent ones")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--deep-page", type=int, default=1000, help="Page number for the deep pagination cases")
+    parser.add_argument("--only", action="append", help="Run only this scenario (repeatable)")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative p95 change reported as a regression")
+    args = parser.parse_args()
+
+    engine = use_sqlite(args.db)
+
+    from benchmarks.synthetic import DatasetSpec, generate
+    from utils.security import get_password_hash
+
+    today = date.today()
+    dataset = None
+    if args.rebuild or not os.path.exists(args.db) or os.path.getsize(args.db) == 0:
+        spec = DatasetSpec(
+            users=args.users, categories_per_user=args.categories, expenses=args.expenses,
+            months=args.months, seed=args.seed
+        )
+        started = time.perf_counter()
+        dataset = generate(engine, spec, get_password_hash("benchmark"), today)
+        print(f"Generated {dataset['expenses']} expenses in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    ctx = _context(today, args.deep_page)
+    results = asyncio.run(_run(engine, ctx, args.iterations, args.warmup, set(args.only or ())))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "database": args.db,
+            "dataset": dataset,
+            "user_expenses": ctx["user_expenses"],
+            "deep_page": ctx["deep_page"],
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare and not _compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
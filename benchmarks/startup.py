@@ -0,0 +1,80 @@
+"""Cold-start measurement: ``import main`` and the startup hook, each in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = """
+import asyncio, json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from benchmarks.env import use_sqlite
+use_sqlite({db!r})
+import main
+imported = time.perf_counter()
+asyncio.run(main.startup_event())
+booted = time.perf_counter()
+main.db_executor.shutdown()
+heavy = [name for name in ("pandas", "numpy", "alembic") if name in sys.modules]
+print(json.dumps({{"import_ms": (imported - started) * 1000, "startup_ms": (booted - imported) * 1000, "loaded": heavy}}))
+"""
+
+def _probe(db: str, importtime: bool = False) -> tuple[dict, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE.format(root=str(ROOT), db=db)]
+    result = subprocess.run(command, capture_output=True, text=True, cwd=ROOT, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def _slowest_imports(importtime_log: str, limit: int) -> list[dict]:
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        # Top-level entries only (nested ones are indented); their time includes their children's.
+        if not name[1:].startswith(" "):
+            modules.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(modules, key=lambda module: module["cumulative_ms"], reverse=True)[:limit]
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {"p50": round(ordered[len(ordered) // 2], 1), "min": round(ordered[0], 1), "max": round(ordered[-1], 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and startup time of the API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest top-level imports to list")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "startup.db")
+        # The first boot applies every migration; later boots only check the revision.
+        first, _ = _probe(db)
+        warm = [_probe(db)[0] for _ in range(args.runs)]
+        _, importtime_log = _probe(db, importtime=True)
+
+    report = {
+        "runs": args.runs,
+        "first_boot": {"import_ms": round(first["import_ms"], 1), "startup_ms": round(first["startup_ms"], 1)},
+        "import_ms": _summary([run["import_ms"] for run in warm]),
+        "startup_ms": _summary([run["startup_ms"] for run in warm]),
+        "heavy_modules_loaded": warm[-1]["loaded"],
+        "slowest_imports": _slowest_imports(importtime_log, args.top),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models import Base, Budget, Category, Expense, User
+from utils.months import month_of, shift_month
+from utils.expense_search import rebuild_expense_terms
+from utils.rollups import rebuild_category_totals, rebuild_monthly_spend
+
+CATEGORY_NAMES = (
+    "Groceries", "Rent", "Utilities", "Transport", "Dining", "Health", "Insurance", "Entertainment",
+    "Travel", "Education", "Gifts", "Clothing", "Subscriptions", "Pets", "Home", "Savings",
+)
+NOTES = ("", "weekly shop", "card", "cash", "online", "refund adjustment", "shared", "monthly")
+
+@dataclass
+class DatasetSpec:
+    users: int = 20
+    categories_per_user: int = 10
+    expenses: int = 200_000
+    months: int = 36
+    budget_months: int = 12
+    uncategorized_share: float = 0.1
+    # User i gets weight 1 / i ** user_skew, so a few users own most of the rows.
+    user_skew: float = 1.0
+    # Month weights grow by this factor per month, so recent months are denser.
+    recency_growth: float = 1.04
+    seed: int = 42
+    chunk_size: int = 10_000
+
+def _weighted_counts(total: int, weights: list[float]) -> list[int]:
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    counts[0] += total - sum(counts)
+    return counts
+
+def _month_start(month: str) -> date:
+    return date.fromisoformat(f"{month}-01")
+
+def generate(engine: Engine, spec: DatasetSpec, password_hash: str, today: date | None = None) -> dict:
+    """Create the schema in ``engine`` and fill it per ``spec``, then build the rollups from the rows."""
+    rng = random.Random(spec.seed)
+    today = today or date.today()
+    now = datetime.now(timezone.utc)
+    last_month = month_of(today)
+    months = [shift_month(last_month, offset) for offset in range(1 - spec.months, 1)]
+    month_weights = [spec.recency_growth ** index for index in range(len(months))]
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    users = [
+        {"id": user_id, "email": f"user{user_id}@bench.local", "name": f"User {user_id}",
+         "password_hash": password_hash, "created_at": now, "updated_at": now}
+        for user_id in range(1, spec.users + 1)
+    ]
+    categories = {}
+    category_rows = []
+    for user in users:
+        names = rng.sample(CATEGORY_NAMES, min(spec.categories_per_user, len(CATEGORY_NAMES)))
+        start = len(category_rows) + 1
+        category_rows.extend(
+            {"id": start + index, "name": name, "user_id": user["id"], "created_at": now, "updated_at": now}
+            for index, name in enumerate(names)
+        )
+        categories[user["id"]] = list(range(start, start + len(names)))
+
+    budget_rows = [
+        {"id": index, "user_id": user_id, "category_id": category_id, "month": month,
+         "amount": round(rng.uniform(100, 1500), 2), "created_at": now, "updated_at": now}
+        for index, (user_id, category_id, month) in enumerate((
+            (user_id, category_id, month)
+            for user_id, category_ids in categories.items()
+            for category_id in category_ids
+            for month in months[-spec.budget_months:]
+        ), start=1)
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), users)
+        conn.execute(insert(Category), category_rows)
+        for start in range(0, len(budget_rows), spec.chunk_size):
+            conn.execute(insert(Budget), budget_rows[start:start + spec.chunk_size])
+
+    user_counts = _weighted_counts(spec.expenses, [1 / (rank ** spec.user_skew) for rank in range(1, spec.users + 1)])
+    next_id = 1
+    batch = []
+    with engine.begin() as conn:
+        for user, count in zip(users, user_counts):
+            user_categories = categories[user["id"]]
+            for month in rng.choices(months, weights=month_weights, k=count):
+                start = _month_start(month)
+                days = (_month_start(shift_month(month, 1)) - start).days
+                if month == last_month:
+                    days = today.day
+                batch.append({
+                    "id": next_id,
+                    "user_id": user["id"],
+                    "category_id": None if rng.random() < spec.uncategorized_share else rng.choice(user_categories),
+                    "amount": round(math.exp(rng.gauss(3.2, 1.0)), 2),
+                    "note": rng.choice(NOTES) or None,
+                    "date": datetime.combine(start + timedelta(days=rng.randrange(days)), datetime.min.time()),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                next_id += 1
+                if len(batch) >= spec.chunk_size:
+                    conn.execute(insert(Expense), batch)
+                    batch.clear()
+        if batch:
+            conn.execute(insert(Expense), batch)
+
+    with Session(engine) as db:
+        rebuild_monthly_spend(db)
+        rebuild_category_totals(db)
+        rebuild_expense_terms(db)
+
+    return {
+        "users": spec.users,
+        "categories": len(category_rows),
+        "budgets": len(budget_rows),
+        "expenses": next_id - 1,
+        "months": [months[0], months[-1]],
+        "heaviest_user_expenses": user_counts[0],
+    }
@@ -1,10 +1,22 @@
 import asyncio
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from config.db_executor import DBExecutor, InstrumentedQueuePool, checkout_wait
 from config.settings import settings
-from models.base import Base
+from utils.metrics import instrument_engine, registry as metrics_registry
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -13,16 +25,103 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+db_executor = DBExecutor(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_URL:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(settings.DB_ASYNC_URL, pool_pre_ping=settings.DB_POOL_PRE_PING)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+async def run_db(db: Session, fn, *args):
+    """Run blocking ORM work for ``db``: on the DB executor, or bridged through run_sync for async sessions."""
+    async_session = db.info.get("async_session")
+    if async_session is not None:
+        return await async_session.run_sync(lambda _: fn(*args))
+    # A session that has run a statement keeps its connection until commit/rollback/close.
+    return await db_executor.run(fn, *args, holds_connection=db.in_transaction())
+
+async def run_in_session(fn, *args):
+    """Run ``fn(session, *args)`` on a session of its own, for work that may outlive the calling request."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as async_session:
+            return await async_session.run_sync(lambda session: fn(session, *args))
+
+    def _run():
+        with SessionLocal() as session:
+            return fn(session, *args)
+    return await db_executor.run(_run)
+
 async def get_db():
+    if AsyncSessionLocal is not None:
+        async_session = AsyncSessionLocal()
+        # Controllers keep the sync Session API; run_db drives it through the async session.
+        session = async_session.sync_session
+        session.info["async_session"] = async_session
+        try:
+            yield session
+        finally:
+            await async_session.close()
+        return
+
     session = SessionLocal()
     try:
         yield session
     finally:
-        await asyncio.to_thread(session.close)
+        # Closing only returns the connection, so it must not queue behind DB work that may itself
+        # be waiting for a connection this session holds; use the loop's default executor instead.
+        await asyncio.get_running_loop().run_in_executor(None, session.close)
 
 
 async def init_db():
+    """Check the schema revision at startup, migrating only if it is behind (see config.migrations)."""
+    from config.migrations import ensure_schema
+
+    if async_engine is not None:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(ensure_schema)
+        return
+
     def _init():
-        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_schema(connection)
+
+    await db_executor.run(_init)
+
+async def warm_pool(connections: int = settings.DB_POOL_WARM_CONNECTIONS):
+    """Open ``connections`` pooled connections up front so the first requests skip connect latency."""
+    if async_engine is not None:
+        opened = [await async_engine.connect() for _ in range(connections)]
+        for connection in opened:
+            await connection.close()
+        return
+
+    def _warm():
+        opened = [engine.connect() for _ in range(connections)]
+        for connection in opened:
+            connection.close()
+
+    await db_executor.run(_warm)
+
+def pool_stats() -> dict:
+    pool = async_engine.sync_engine.pool if async_engine is not None else engine.pool
+    stats = {"checkout_wait": checkout_wait.snapshot()}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return {"pool": stats, "executor": db_executor.stats()}
+
+def _pool_gauges() -> dict:
+    stats = pool_stats()
+    values = {(f"pool_{name}",): value for name, value in stats["pool"].items() if name != "checkout_wait"}
+    values.update({(f"executor_{name}",): stats["executor"][name] for name in ("workers", "queued", "running")})
+    return values
 
-    await asyncio.to_thread(_init)
\ No newline at end of file
+metrics_registry.gauge("db_pool_state", "Connection pool and DB executor occupancy", _pool_gauges, ("stat",))
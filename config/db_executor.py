@@ -0,0 +1,101 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.pool import QueuePool
+from utils import metrics
+
+class _WaitStats:
+    def __init__(self, histogram=None):
+        self.histogram = histogram
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        if self.histogram is not None:
+            self.histogram.observe(seconds)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                "max_ms": round(self.max * 1000, 3),
+            }
+
+checkout_wait = _WaitStats(metrics.pool_checkout_wait)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait.observe(time.perf_counter() - started)
+
+class DBExecutor:
+    """Thread pools for blocking database work, each sized to the connection pool.
+
+    With one thread per pooled connection, work waits visibly in this queue rather than
+    holding a thread while blocked on pool checkout. Sessions keep their connection across
+    awaits between calls, so work for a session that already holds one runs on a second pool
+    of the same size: it never queues behind threads waiting for the connections those
+    sessions hold, and with at most one call per held connection it never waits for a thread.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.queue_wait = _WaitStats()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._executors: dict[bool, ThreadPoolExecutor] = {}
+
+    def _get_executor(self, holds_connection: bool) -> ThreadPoolExecutor:
+        executor = self._executors.get(holds_connection)
+        if executor is None:
+            executor = self._executors[holds_connection] = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="db-held" if holds_connection else "db"
+            )
+        return executor
+
+    async def run(self, fn, *args, holds_connection: bool = False):
+        # Like asyncio.to_thread, carry the caller's context variables into the worker thread.
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def _call():
+            waited = time.perf_counter() - submitted
+            self.queue_wait.observe(waited)
+            context.run(metrics.observe_queue_wait, waited)
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return context.run(fn, *args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(holds_connection), _call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued, running = self._queued, self._running
+        return {"workers": 2 * self.workers, "queued": queued, "running": running, "queue_wait": self.queue_wait.snapshot()}
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
@@ -0,0 +1,74 @@
+from pathlib import Path
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from config.settings import settings
+
+ROOT = Path(__file__).resolve().parent.parent
+# Revision 0001 is exactly the tables the app created on startup before migrations existed.
+BASELINE_REVISION = "0001"
+BASELINE_TABLES = frozenset({"users", "categories", "expenses", "budgets"})
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def _alembic_config(connection: Connection | None = None):
+    from alembic.config import Config
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+def current_revision(connection: Connection) -> str | None:
+    from alembic.migration import MigrationContext
+
+    return MigrationContext.configure(connection).get_current_revision()
+
+def _model_tables() -> set[str]:
+    import models
+
+    return set(models.Base.metadata.tables)
+
+def ensure_schema(connection: Connection, auto_migrate: bool = settings.DB_AUTO_MIGRATE) -> str | None:
+    """Bring the schema to the head revision, running DDL only when it is behind.
+
+    Returns the revision upgraded from, or None when the schema was already current. Raises
+    SchemaOutOfDate when an upgrade is needed but ``auto_migrate`` is off, when tables exist
+    without a recorded revision (a database made by the old create_all startup needs
+    ``alembic stamp 0001``; any other unversioned schema is refused), or when the recorded
+    revision is current but tables are missing, e.g. after stamping past DDL that never ran.
+    """
+    current, head = current_revision(connection), head_revision()
+    if current is None:
+        existing = set(inspect(connection).get_table_names())
+        if existing & BASELINE_TABLES:
+            if existing >= BASELINE_TABLES and not existing & (_model_tables() - BASELINE_TABLES):
+                raise SchemaOutOfDate(
+                    f"Tables exist but no migration revision is recorded; they match the baseline, so run "
+                    f"`alembic stamp {BASELINE_REVISION}` then restart"
+                )
+            raise SchemaOutOfDate(
+                "Tables exist but no migration revision is recorded, and they do not match the baseline "
+                f"revision {BASELINE_REVISION} ({', '.join(sorted(BASELINE_TABLES))}); "
+                "stamping would skip DDL, so fix the schema by hand"
+            )
+    if current != head:
+        if not auto_migrate:
+            raise SchemaOutOfDate(f"Database schema is at {current or 'base'}, expected {head}; run `alembic upgrade head`")
+
+        from alembic import command
+
+        command.upgrade(_alembic_config(connection), "head")
+    missing = sorted(_model_tables() - set(inspect(connection).get_table_names()))
+    if missing:
+        raise SchemaOutOfDate(
+            f"Database schema is recorded at {head} but is missing tables {', '.join(missing)}; "
+            "it was likely stamped past migrations that never ran"
+        )
+    return None if current == head else current or "base"
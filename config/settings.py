@@ -17,6 +17,77 @@ class Settings(BaseSettings):
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int
     CURRENCY_SYMBOL: str
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARM_CONNECTIONS: int = 2
+    # e.g. "sqlite+aiosqlite:///./pft.db"; when set, requests use an AsyncSession on this URL.
+    DB_ASYNC_URL: str | None = None
+    # Apply pending Alembic migrations at startup; when false, startup fails if the schema is behind.
+    DB_AUTO_MIGRATE: bool = True
+
+    ID_BLOCK_SIZE: int = 100
+    IMPORT_BATCH_SIZE: int = 500
+    EXPORT_BATCH_SIZE: int = 1000
+    # Group-commit concurrent create_expense calls: inserts arriving within the wait window
+    # share one multi-row INSERT and commit. Sync-engine mode only.
+    EXPENSE_WRITE_COALESCING: bool = False
+    WRITE_COALESCE_MAX_BATCH: int = 100
+    WRITE_COALESCE_MAX_WAIT_MS: float = 5
+    WRITE_COALESCE_MAX_PENDING: int = 1000
+
+    RECURRING_BATCH_SIZE: int = 500
+    # Occurrences generated per schedule per run; a schedule further behind catches up over later runs.
+    RECURRING_CATCHUP_LIMIT: int = 120
+    # How often the app materializes due recurring expenses in the background; 0 leaves it to the CLI.
+    RECURRING_MATERIALIZE_INTERVAL_SECONDS: float = 3600
+
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    # Trust the user id/name embedded in access tokens instead of loading the user per request.
+    # Deleted users and password changes then only take effect when their tokens expire.
+    AUTH_TOKEN_EMBEDS_USER: bool = False
+    # Emails allowed to use admin-only endpoints, e.g. '["ops@example.com"]'.
+    ADMIN_EMAILS: list[str] = []
+
+    REPORT_CACHE_SIZE: int = 10000
+    REPORT_CACHE_TTL_SECONDS: float = 300
+    TREND_MAX_MONTHS: int = 60
+    # Answer reports for users read often from in-memory NumPy columns of their expenses instead of
+    # SQL (see utils/expense_store.py). Per process: each worker holds and updates its own copy.
+    EXPENSE_STORE_ENABLED: bool = False
+    EXPENSE_STORE_MEMORY_MB: float = 256
+    # Report reads within the TTL before a user's expenses are loaded.
+    EXPENSE_STORE_LOAD_AFTER: int = 3
+    EXPENSE_STORE_TTL_SECONDS: float = 300
+
+    SLOW_QUERY_SECONDS: float = 0.5
+    SLOW_QUERY_SAMPLES: int = 100
+    # Adds a Server-Timing header (total, db, queue) to every response.
+    METRICS_SERVER_TIMING: bool = False
+
+    # Opt-in token buckets per client (bearer token subject, else address) and route class; see middleware/rate_limit.py.
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_READ_PER_SECOND: float = 20
+    RATE_LIMIT_READ_BURST: int = 40
+    RATE_LIMIT_WRITE_PER_SECOND: float = 10
+    RATE_LIMIT_WRITE_BURST: int = 20
+    RATE_LIMIT_EXPENSIVE_PER_SECOND: float = 1
+    RATE_LIMIT_EXPENSIVE_BURST: int = 10
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # "package.module:attribute" of a shared RateLimitBackend (instance or factory); in-process when unset.
+    RATE_LIMIT_BACKEND: str | None = None
+    # Reports, exports, imports and search in flight per process, across all users.
+    EXPENSIVE_MAX_CONCURRENCY: int = 4
+    EXPENSIVE_QUEUE_TIMEOUT_SECONDS: float = 1
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_USE_PROCESSES: bool = False
+
     @property
     def DATABASE_URL(self) -> str:
         return (
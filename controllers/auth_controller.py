@@ -1,41 +1,47 @@
-import asyncio
 from sqlalchemy.orm import Session
+from config.database import run_db
 from sqlalchemy import text, select
 import sqlalchemy.exc
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 from utils.security import (
-    verify_password, create_access_token, get_password_hash, 
+    hash_password, check_password, create_access_token,
     create_password_reset_token, verify_password_reset_token
 )
 from models.user import User
+from config.settings import settings
+from middleware.auth import invalidate_principal
+from utils.id_allocator import id_allocator
+
+def _find_user(db: Session, email: str) -> User | None:
+    return db.execute(select(User).filter(User.email == email)).scalars().first()
 
 async def register(db: Session, email: str, name: str, password: str) -> dict:
-    def _register():
-        if db.execute(select(User).filter(User.email == email)).scalars().first():
-            raise HTTPException(status_code=400, detail="Email already registered")
+    if await run_db(db, _find_user, db, email):
+        raise HTTPException(status_code=400, detail="Email already registered")
 
-        hashed_password = get_password_hash(password)
-        
+    hashed_password = await hash_password(password)
+
+    def _register():
+        # Both paths take the id from the allocator, like every other insert, so an identity
+        # column can never hand out an id that is also part of an allocated block.
+        next_id = id_allocator.next_id(db, "users")
+        now = datetime.now(timezone.utc)
         try:
-            user = User(email=email, name=name, password_hash=hashed_password)
+            user = User(id=next_id, email=email, name=name, password_hash=hashed_password, created_at=now, updated_at=now)
             db.add(user)
             db.commit()
             db.refresh(user)
         except sqlalchemy.exc.SQLAlchemyError as e:
             db.rollback()
-            print(f"ORM creation failed, falling back to manual ID generation. Error: {e}")
+            print(f"ORM creation failed, falling back to a plain INSERT. Error: {e}")
             
             try:
-                result = db.execute(text("SELECT COALESCE(MAX(id), 0) + 1 FROM users"))
-                next_id = result.scalar_one()
-                
                 insert_sql = text("""
                     INSERT INTO users (id, email, name, password_hash, created_at, updated_at) 
                     VALUES (:id, :email, :name, :password_hash, :created_at, :updated_at)
                 """)
                 
-                now = datetime.now(timezone.utc)
                 db.execute(insert_sql, {
                     'id': next_id,
                     'email': email,
@@ -48,7 +54,7 @@ async def register(db: Session, email: str, name: str, password: str) -> dict:
                 
                 user = db.execute(select(User).filter(User.id == next_id)).scalars().first()
             except sqlalchemy.exc.SQLAlchemyError as manual_e:
-                print(f"Manual ID generation also failed. Error: {manual_e}")
+                print(f"Plain INSERT also failed. Error: {manual_e}")
                 raise HTTPException(status_code=500, detail="Failed to create user using fallback method.") from manual_e
 
         if not user or user.id is None:
@@ -56,49 +62,71 @@ async def register(db: Session, email: str, name: str, password: str) -> dict:
         
         return {"id": user.id, "email": user.email, "name": user.name}
 
-    return await asyncio.to_thread(_register)
+    return await run_db(db, _register)
 
 async def login(db: Session, email: str, password: str) -> dict:
+    user = await run_db(db, _find_user, db, email)
+    valid, new_hash = await check_password(password, user.password_hash) if user else (False, None)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
     def _login():
-        user = db.execute(select(User).filter(User.email == email)).scalars().first()
-        if not user or not verify_password(password, user.password_hash):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        token = create_access_token(data={"sub": user.email})
+        if new_hash:
+            user.password_hash = new_hash
+            db.commit()
+        claims = {"sub": user.email}
+        if settings.AUTH_TOKEN_EMBEDS_USER:
+            claims.update(uid=user.id, name=user.name)
+        token = create_access_token(data=claims)
         return {"message": "Login successful", "access_token": token, "token_type": "bearer"}
-    return await asyncio.to_thread(_login)
+    return await run_db(db, _login)
 
 async def forgot_password(db: Session, email: str) -> dict:
     def _forgot_password():
-        user = db.execute(select(User).filter(User.email == email)).scalars().first()
+        user = _find_user(db, email)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
         reset_token = create_password_reset_token(email=user.email)
         return {"message": "Password reset token generated", "reset_token": reset_token}
-    return await asyncio.to_thread(_forgot_password)
+    return await run_db(db, _forgot_password)
 
 async def reset_password(db: Session, token: str, new_password: str) -> dict:
-    def _reset_password():
-        email = verify_password_reset_token(token)
-        if not email:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
+    email = verify_password_reset_token(token)
+    if not email:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
 
-        user = db.execute(select(User).filter(User.email == email)).scalars().first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user = await run_db(db, _find_user, db, email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        user.password_hash = get_password_hash(new_password)
+    new_hash = await hash_password(new_password)
+
+    def _reset_password():
+        user.password_hash = new_hash
         db.commit()
+        invalidate_principal(user.email)
 
         return {"message": "Password has been reset successfully"}
-    return await asyncio.to_thread(_reset_password)
+    return await run_db(db, _reset_password)
 
 async def update_password(db: Session, user: User, current_password: str, new_password: str):
-    def _update_password():
-        if not verify_password(current_password, user.password_hash):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect current password")
+    def _get_user():
+        # The authenticated principal may be a cached or token-built copy, so load the row being changed.
+        return db.execute(select(User).filter(User.id == user.id)).scalars().first()
+
+    db_user = await run_db(db, _get_user)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    valid, _ = await check_password(current_password, db_user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect current password")
 
-        user.password_hash = get_password_hash(new_password)
+    new_hash = await hash_password(new_password)
+
+    def _update_password():
+        db_user.password_hash = new_hash
         db.commit()
+        invalidate_principal(db_user.email)
         return {"message": "Password updated successfully"}
-    return await asyncio.to_thread(_update_password)
+    return await run_db(db, _update_password)
@@ -1,9 +1,15 @@
-import asyncio
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select
+from config.database import run_db
+from sqlalchemy import text, select, func
 from fastapi import HTTPException
 from models.budget import Budget
+from models.category import Category
+from models.monthly_spend import MonthlySpend
 from models.user import User
+from utils.budget_alerts import alert_level, budget_alert, usage_percentage
+from utils.id_allocator import id_allocator
+from utils.months import parse_month
+from utils.report_cache import touch_report_months
 from datetime import datetime, timezone
 
 async def create_budget(db: Session, user: User, month: str, amount: float, category_id: int):
@@ -20,14 +26,15 @@ async def create_budget(db: Session, user: User, month: str, amount: float, cate
             )
         
         try:
-            max_id_result = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM budgets")).scalar_one()
-            next_id = max_id_result + 1
+            next_id = id_allocator.next_id(db, "budgets")
 
             now = datetime.now(timezone.utc)
             db.execute(
                 text("INSERT INTO budgets (id, user_id, category_id, month, amount, created_at, updated_at) VALUES (:id, :user_id, :category_id, :month, :amount, :created_at, :updated_at)"),
                 {'id': next_id, 'user_id': user.id, 'category_id': category_id, 'month': month, 'amount': amount, 'created_at': now, 'updated_at': now}
             )
+            # Budgets show up in category listings, which are versioned by the report generation.
+            touch_report_months(db, user.id, [month])
             db.commit()
 
             new_budget = db.execute(select(Budget).filter(Budget.id == next_id)).scalars().first()
@@ -35,7 +42,7 @@ async def create_budget(db: Session, user: User, month: str, amount: float, cate
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create budget: {e}") from e
-    return await asyncio.to_thread(_create)
+    return await run_db(db, _create)
 
 async def update_budget(db: Session, user: User, budget_id: int, month: str, amount: float, category_id: int):
     def _update():
@@ -55,13 +62,14 @@ async def update_budget(db: Session, user: User, budget_id: int, month: str, amo
                 detail=f"Another budget for this category in month {month} already exists."
             )
 
+        touch_report_months(db, user.id, {budget.month, month})
         budget.month = month
         budget.amount = amount
         budget.category_id = category_id
         db.commit()
         db.refresh(budget)
         return budget
-    return await asyncio.to_thread(_update)
+    return await run_db(db, _update)
 
 async def get_budget(db: Session, user: User, month: str):
     def _get():
@@ -81,20 +89,68 @@ async def get_budget(db: Session, user: User, month: str):
             } for budget in budgets
         }
         return formatted_budgets
-    return await asyncio.to_thread(_get)
+    return await run_db(db, _get)
+
+async def budget_status(db: Session, user: User, month: str) -> dict:
+    """Spend against every budgeted category of ``month``, for progress bars and alerts."""
+    try:
+        month = parse_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Month must be in YYYY-MM format") from e
+
+    def _status():
+        # One statement: budgets joined to their category and the month's rollup row.
+        rows = db.execute(select(
+            Budget.category_id,
+            Category.name.label("category_name"),
+            Budget.amount,
+            func.coalesce(MonthlySpend.total, 0).label("spent")
+        ).join(Category, Category.id == Budget.category_id).outerjoin(MonthlySpend,
+            (MonthlySpend.user_id == Budget.user_id) & (MonthlySpend.category_id == Budget.category_id) & (MonthlySpend.month == Budget.month)
+        ).filter(Budget.user_id == user.id, Budget.month == month).order_by(Category.name)).all()
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No budgets found for month {month}")
+
+        categories = []
+        for row in rows:
+            alert, status = budget_alert(row.spent, row.amount)
+            categories.append({
+                "category_id": row.category_id,
+                "category_name": row.category_name,
+                "amount": float(row.amount),
+                "spent": float(row.spent),
+                "remaining": float(row.amount - row.spent),
+                "percentage": round(usage_percentage(row.spent, row.amount), 2),
+                "alert_level": alert_level(row.spent, row.amount),
+                "budget_status": status,
+                "alert": alert
+            })
+        total_budget = sum(row.amount for row in rows)
+        total_spent = sum(row.spent for row in rows)
+        return {
+            "month": month,
+            "total_budget": float(total_budget),
+            "total_spent": float(total_spent),
+            "total_remaining": float(total_budget - total_spent),
+            "categories": categories
+        }
+    return await run_db(db, _status)
 
 async def list_budgets(db: Session, user: User):
     def _list():
-        budgets = db.execute(select(Budget).filter(Budget.user_id == user.id).order_by(Budget.month.desc())).scalars().all()
+        budgets = db.execute(select(
+            Budget.id, Budget.user_id, Budget.category_id, Budget.month,
+            Budget.amount, Budget.created_at, Budget.updated_at
+        ).filter(Budget.user_id == user.id).order_by(Budget.month.desc())).all()
         
         budgets_by_month = {}
         for budget in budgets:
             if budget.month not in budgets_by_month:
                 budgets_by_month[budget.month] = {}
-            budgets_by_month[budget.month][budget.category_id] = budget
+            budgets_by_month[budget.month][budget.category_id] = budget._asdict()
             
         return budgets_by_month
-    return await asyncio.to_thread(_list)
+    return await run_db(db, _list)
 
 async def delete_budget(db: Session, user: User, budget_id: int):
     def _delete():
@@ -102,7 +158,8 @@ async def delete_budget(db: Session, user: User, budget_id: int):
         if not budget:
             raise HTTPException(status_code=404, detail="Budget not found")
         
+        touch_report_months(db, user.id, [budget.month])
         db.delete(budget)
         db.commit()
         return {"message": "Budget deleted successfully"}
-    return await asyncio.to_thread(_delete)
\ No newline at end of file
+    return await run_db(db, _delete)
\ No newline at end of file
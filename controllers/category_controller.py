@@ -1,55 +1,56 @@
-import asyncio
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, select
+from config.database import run_db, run_in_session
+from sqlalchemy import text, func, select, update
 from models.category import Category
-from models.expense import Expense
+from models.category_total import CategoryTotal
+from models.monthly_spend import MonthlySpend
 from models.budget import Budget
+from models.recurring_expense import RecurringExpense
 from models.user import User
+from utils.id_allocator import id_allocator
+from utils.months import month_of
+from utils.report_cache import report_cache, touch_report_months
+from utils.expense_store import drop_expense_columns
+from utils.singleflight import single_flight
+from utils.rollups import forget_category
 from fastapi import HTTPException
 from config.settings import settings
 from datetime import datetime, timezone
 
 async def list_categories(db: Session, user: User):
-    def _list():
-        current_month = datetime.now().strftime("%Y-%m")
-
-        budget_subquery = select(
-            Budget.category_id,
-            Budget.amount.label("monthly_budget")
-        ).filter(
-            Budget.user_id == user.id,
-            Budget.month == current_month
-        ).subquery()
+    def _list(db: Session):
+        current_month = month_of(datetime.now())
 
         results = db.execute(select(
             Category.id,
             Category.name,
             Category.user_id,
-            func.coalesce(func.sum(Expense.amount), 0.0).label("total_expenses"),
-            budget_subquery.c.monthly_budget
-        ).outerjoin(Expense, Category.id == Expense.category_id)\
-         .outerjoin(budget_subquery, Category.id == budget_subquery.c.category_id)\
+            func.coalesce(CategoryTotal.total, 0).label("total_expenses"),
+            func.coalesce(MonthlySpend.total, 0).label("current_month_expenses"),
+            Budget.amount.label("monthly_budget")
+        ).outerjoin(CategoryTotal, (CategoryTotal.category_id == Category.id) & (CategoryTotal.user_id == user.id))\
+         .outerjoin(MonthlySpend, (MonthlySpend.category_id == Category.id) & (MonthlySpend.user_id == user.id) & (MonthlySpend.month == current_month))\
+         .outerjoin(Budget, (Budget.category_id == Category.id) & (Budget.user_id == user.id) & (Budget.month == current_month))\
          .filter(Category.user_id == user.id)\
-         .group_by(
-             Category.id, 
-             Category.name, 
-             Category.user_id, 
-             budget_subquery.c.monthly_budget
-         )\
          .order_by(Category.name))
 
+        money = f"{settings.CURRENCY_SYMBOL}{{:.2f}}".format
         formatted_categories = {}
         for category in results.all():
             formatted_categories[category.id] = {
                 "id": category.id,
                 "name": category.name,
                 "user_id": category.user_id,
-                "total_expenses": f"{settings.CURRENCY_SYMBOL}{category.total_expenses:.2f}",
-                "current_month_budget": f"{settings.CURRENCY_SYMBOL}{category.monthly_budget:.2f}" if category.monthly_budget is not None else "Not Set"
+                "total_expenses": money(category.total_expenses),
+                "current_month_expenses": money(category.current_month_expenses),
+                "current_month_budget": money(category.monthly_budget) if category.monthly_budget is not None else "Not Set"
             }
             
         return formatted_categories
-    return await asyncio.to_thread(_list)
+    # Category listings change with the same writes that invalidate reports, so the report
+    # generation versions the single-flight key. Like reports, the shared call uses its own session.
+    generation = report_cache.generation(user.id)
+    return await single_flight.do("list_categories", (user.id, generation), lambda: run_in_session(_list))
 
 async def create_category(db: Session, user: User, name: str):
     def _create():
@@ -58,14 +59,15 @@ async def create_category(db: Session, user: User, name: str):
             raise HTTPException(status_code=400, detail="Category already exists")
         
         try:
-            max_id_result = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM categories")).scalar_one()
-            next_id = max_id_result + 1
+            next_id = id_allocator.next_id(db, "categories")
 
             now = datetime.now(timezone.utc)
             db.execute(
                 text("INSERT INTO categories (id, name, user_id, created_at, updated_at) VALUES (:id, :name, :user_id, :created_at, :updated_at)"),
                 {'id': next_id, 'name': name, 'user_id': user.id, 'created_at': now, 'updated_at': now}
             )
+            touch_report_months(db, user.id, [None])
+            drop_expense_columns(db, user.id)
             db.commit()
             
             new_cat = db.execute(select(Category).filter(Category.id == next_id)).scalars().first()
@@ -73,7 +75,7 @@ async def create_category(db: Session, user: User, name: str):
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create category: {e}") from e
-    return await asyncio.to_thread(_create)
+    return await run_db(db, _create)
 
 async def update_category(db: Session, user: User, category_id: int, name: str):
     def _update():
@@ -90,10 +92,12 @@ async def update_category(db: Session, user: User, category_id: int, name: str):
             raise HTTPException(status_code=409, detail=f"Category name '{name}' already exists.")
 
         category.name = name
+        touch_report_months(db, user.id, [None])
+        drop_expense_columns(db, user.id)
         db.commit()
         db.refresh(category)
         return category
-    return await asyncio.to_thread(_update)
+    return await run_db(db, _update)
 
 async def delete_category(db: Session, user: User, category_id: int):
     def _delete():
@@ -101,7 +105,12 @@ async def delete_category(db: Session, user: User, category_id: int):
         if not cat:
             raise HTTPException(status_code=404, detail="Category not found")
         
+        forget_category(db, user.id, cat.id)
+        touch_report_months(db, user.id, [None])
+        drop_expense_columns(db, user.id)
+        # Schedules outlive their category: later occurrences are recorded uncategorized.
+        db.execute(update(RecurringExpense).where(RecurringExpense.category_id == cat.id).values(category_id=None))
         db.delete(cat)
         db.commit()
         return {"message": "Category deleted successfully"}
-    return await asyncio.to_thread(_delete)
+    return await run_db(db, _delete)
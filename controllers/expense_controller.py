@@ -1,12 +1,44 @@
-import asyncio
 from datetime import date, datetime, timezone
-from typing import Optional
-from sqlalchemy import func, text, select
+from collections import defaultdict
+from typing import BinaryIO, NamedTuple, Optional
+from pydantic import ValidationError
+from sqlalchemy import case, func, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from config.database import AsyncSessionLocal, SessionLocal, db_executor, run_db
+from config.settings import settings
 from models.expense import Expense
+from models.category import Category
 from models.user import User
 from models.budget import Budget
+from models.monthly_spend import MonthlySpend
+from models.expense_term import ExpenseTerm
+from utils.rollups import ExpenseSnapshot, record_expense_changes, record_expenses
+from utils.id_allocator import id_allocator
+from utils.pagination import InvalidCursor, encode_cursor, keyset_order, keyset_paginate
+from utils.expense_import import IMPORT_FORMATS
+from utils.expense_export import EXPORT_MEDIA_TYPES, csv_chunk, csv_header, encode_export, ndjson_chunk
+from utils.budget_alerts import budget_alert
+from utils.expense_search import QUERY_MAX_TERMS, tokenize
+from utils.filters import prefix_match
+from utils.months import month_of
+from utils.responses import iso_date
+from utils.write_coalescer import WriteCoalescer
+from schemas.expense_schema import ExpenseIn
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+EXPENSE_ORDER = ((Expense.date, True), (Expense.id, True))
+
+EXPENSE_COLUMNS = (
+    Expense.id, Expense.user_id, Expense.category_id, Expense.amount,
+    Expense.note, Expense.date, Expense.created_at, Expense.updated_at
+)
+
+def _expense_item(row) -> dict:
+    item = row._asdict()
+    item["date"] = iso_date(item["date"])
+    return item
 
 async def list_expenses(
     db: Session, 
@@ -15,10 +47,13 @@ async def list_expenses(
     per_page: int = 20,
     category_id: Optional[int] = None,
     start_date: Optional[date] = None,
-    end_date: Optional[date] = None
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ) -> dict:
+    """Expense page as plain dicts in the ExpenseResponse shape, ready for TrustedJSONResponse."""
     def _list():
-        q = select(Expense).filter(Expense.user_id == user.id)
+        q = select(*EXPENSE_COLUMNS).filter(Expense.user_id == user.id)
 
         if category_id:
             q = q.filter(Expense.category_id == category_id)
@@ -29,89 +64,332 @@ async def list_expenses(
         if end_date:
             q = q.filter(Expense.date <= end_date)
 
-        total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one() # pylint: disable=not-callable
+        total = None
+        if include_total:
+            total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one() # pylint: disable=not-callable
 
-        q = q.order_by(Expense.date.desc(), Expense.id.desc())
-        
-        items = db.execute(q.offset((page - 1) * per_page).limit(per_page)).scalars().all()
+        if cursor:
+            try:
+                rows, next_cursor = keyset_paginate(db, q, EXPENSE_ORDER, cursor, per_page)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+        else:
+            q = q.order_by(*keyset_order(EXPENSE_ORDER))
+            rows = db.execute(q.offset((page - 1) * per_page).limit(per_page + 1)).all()
+            next_cursor = encode_cursor([rows[per_page - 1].date, rows[per_page - 1].id]) if len(rows) > per_page else None
+            rows = rows[:per_page]
         
         return {
             "title": "Expense List",
             "data": {
                 "total": total, 
-                "page": page, 
+                "page": None if cursor else page, 
                 "per_page": per_page, 
-                "items": items
+                "items": [_expense_item(row) for row in rows],
+                "next_cursor": next_cursor
+            }
+        }
+    return await run_db(db, _list)
+
+async def search_expenses(
+    db: Session,
+    user: User,
+    query: str,
+    page: int = 1,
+    per_page: int = 20,
+    category_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    include_total: bool = True
+) -> dict:
+    """Expenses whose note has a word starting with any query word, best matches first.
+
+    Ranked by query words matched, then words matched exactly, then recency; served from the
+    ``expense_terms`` index and returned in the list_expenses shape.
+    """
+    terms = tokenize(query)[:QUERY_MAX_TERMS]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query needs a word of at least two characters")
+
+    def _search():
+        matched = sum(func.max(case((prefix_match(ExpenseTerm.term, term), 1), else_=0)) for term in terms)
+        exact = sum(func.max(case((ExpenseTerm.term == term, 1), else_=0)) for term in terms)
+        hits = select(
+            ExpenseTerm.expense_id,
+            matched.label("matched"),
+            exact.label("exact")
+        ).filter(
+            ExpenseTerm.user_id == user.id,
+            or_(*(prefix_match(ExpenseTerm.term, term) for term in terms))
+        ).group_by(ExpenseTerm.expense_id).subquery()
+
+        q = select(*EXPENSE_COLUMNS).join(hits, hits.c.expense_id == Expense.id).filter(Expense.user_id == user.id)
+        if category_id:
+            q = q.filter(Expense.category_id == category_id)
+        if start_date:
+            q = q.filter(Expense.date >= start_date)
+        if end_date:
+            q = q.filter(Expense.date <= end_date)
+
+        total = None
+        if include_total:
+            total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one() # pylint: disable=not-callable
+
+        rows = db.execute(q.order_by(
+            hits.c.matched.desc(), hits.c.exact.desc(), Expense.date.desc(), Expense.id.desc()
+        ).offset((page - 1) * per_page).limit(per_page)).all()
+        return {
+            "title": "Expense Search",
+            "data": {
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "items": [_expense_item(row) for row in rows],
+                "next_cursor": None
             }
         }
-    return await asyncio.to_thread(_list)
+    return await run_db(db, _search)
+
+def _budget_alerts(db: Session, user_id: int, keys: set[tuple[int, str]]) -> dict:
+    """Alert and status per budgeted (category_id, month) in ``keys``, in two queries however many keys."""
+    if not keys:
+        return {}
+    categories = {category_id for category_id, _ in keys}
+    months = {month for _, month in keys}
+
+    budgets = {
+        (row.category_id, row.month): row.amount
+        for row in db.execute(select(Budget.category_id, Budget.month, Budget.amount).filter(
+            Budget.user_id == user_id,
+            Budget.category_id.in_(categories),
+            Budget.month.in_(months)
+        ))
+        if (row.category_id, row.month) in keys
+    }
+    if not budgets:
+        return {}
+
+    totals = {
+        (row.category_id, row.month): row.total
+        for row in db.execute(select(
+            MonthlySpend.category_id,
+            MonthlySpend.month,
+            func.sum(MonthlySpend.total).label("total")
+        ).filter(
+            MonthlySpend.user_id == user_id,
+            MonthlySpend.category_id.in_(categories),
+            MonthlySpend.month.in_(months)
+        ).group_by(MonthlySpend.category_id, MonthlySpend.month))
+    }
+    return {key: budget_alert(totals.get(key) or 0, amount) for key, amount in budgets.items()}
+
+class ExpenseWrite(NamedTuple):
+    user_id: int
+    amount: float
+    date: date
+    note: str | None
+    category_id: int | None
+
+def insert_expenses(db: Session, writes: list[ExpenseWrite]) -> list[int]:
+    """Insert ``writes`` as one batch and fold them into the rollups; the caller commits."""
+    ids = id_allocator.allocate(db, "expenses", len(writes))
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            'id': expense_id,
+            'user_id': write.user_id,
+            'category_id': write.category_id,
+            'amount': write.amount,
+            'note': write.note,
+            'date': write.date,
+            'created_at': now,
+            'updated_at': now
+        } for expense_id, write in zip(ids, writes)
+    ]
+    # One executemany; render_nulls keeps rows with and without a category in the same batch.
+    db.execute(insert(Expense).execution_options(render_nulls=True), rows)
+
+    record_expense_changes(db, [
+        (row['user_id'], ExpenseSnapshot(row['id'], row['category_id'], row['date'], row['amount'], row['note']), 1) for row in rows
+    ])
+    return ids
+
+def _created_results(db: Session, writes: list[ExpenseWrite], ids: list[int]) -> list[dict]:
+    expenses = {expense.id: expense for expense in db.execute(select(Expense).filter(Expense.id.in_(ids))).scalars()}
+
+    keys = defaultdict(set)
+    for write in writes:
+        if write.category_id:
+            keys[write.user_id].add((write.category_id, month_of(write.date)))
+    alerts = {user_id: _budget_alerts(db, user_id, user_keys) for user_id, user_keys in keys.items()}
+
+    results = []
+    for expense_id, write in zip(ids, writes):
+        alert_message, budget_status = None, None
+        if write.category_id:
+            alert_message, budget_status = alerts[write.user_id].get((write.category_id, month_of(write.date)), (None, None))
+        results.append({"expense": expenses[expense_id], "alert": alert_message, "budget_status": budget_status})
+    return results
+
+def _create_expense_batch(writes: list[ExpenseWrite]) -> list:
+    """Flush for the write coalescer: one INSERT and commit for the batch, or per write if that fails.
+
+    Only a failed insert or commit falls back; results are read back after the rows are committed,
+    so a failing read never inserts them again.
+    """
+    with SessionLocal() as db:
+        try:
+            ids = insert_expenses(db, writes)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+        else:
+            return _created_results(db, writes, ids)
+
+        # Retry individually so one bad row (e.g. a category deleted meanwhile) only fails its own caller.
+        results, committed, committed_ids = [], [], []
+        for write in writes:
+            try:
+                ids = insert_expenses(db, [write])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                results.append(HTTPException(status_code=500, detail=f"Failed to create expense: {e}"))
+                continue
+            results.append(None)
+            committed.append(write)
+            committed_ids.extend(ids)
+
+        created = iter(_created_results(db, committed, committed_ids) if committed else ())
+        return [next(created) if result is None else result for result in results]
+
+expense_writes = WriteCoalescer(
+    "expenses",
+    _create_expense_batch,
+    db_executor.run,
+    max_batch=settings.WRITE_COALESCE_MAX_BATCH,
+    max_wait=settings.WRITE_COALESCE_MAX_WAIT_MS / 1000,
+    max_pending=settings.WRITE_COALESCE_MAX_PENDING,
+)
 
 async def create_expense(db: Session, user: User, amount: float, date_: date, note: str | None, category_id: int | None):
+    write = ExpenseWrite(user.id, amount, date_, note, category_id)
+    if settings.EXPENSE_WRITE_COALESCING and AsyncSessionLocal is None:
+        return await expense_writes.submit(write)
+
     def _create():
         try:
-            max_id_result = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM expenses")).scalar_one()
-            next_id = max_id_result + 1
-
-            now = datetime.now(timezone.utc)
-            db.execute(
-                text("""
-                    INSERT INTO expenses (id, user_id, category_id, amount, note, date, created_at, updated_at) 
-                    VALUES (:id, :user_id, :category_id, :amount, :note, :date, :created_at, :updated_at)
-                """),
-                {
-                    'id': next_id,
-                    'user_id': user.id,
-                    'category_id': category_id,
-                    'amount': amount,
-                    'note': note,
-                    'date': date_,
-                    'created_at': now,
-                    'updated_at': now
-                }
-            )
+            ids = insert_expenses(db, [write])
             db.commit()
-
-            new_expense = db.execute(select(Expense).filter(Expense.id == next_id)).scalars().first()
-            
-            alert_message = None
-            budget_status = None
-
-            if category_id:
-                month_str = date_.strftime('%Y-%m')
-                
-                budget = db.execute(select(Budget).filter(
-                    Budget.user_id == user.id,
-                    Budget.category_id == category_id,
-                    Budget.month == month_str
-                )).scalars().first()
-
-                if budget:
-                    if db.bind.url.get_backend_name() == "sqlite":
-                        date_filter = func.strftime('%Y-%m', Expense.date) == month_str
-                    else:
-                        date_filter = func.to_char(Expense.date, 'YYYY-MM') == month_str
-
-                    total_spent_result = db.execute(select(func.sum(Expense.amount)).filter(
-                        Expense.user_id == user.id,
-                        Expense.category_id == category_id,
-                        date_filter
-                    )).first()
-                    
-                    total_spent = total_spent_result[0] if total_spent_result and total_spent_result[0] is not None else 0.0
-
-                    if total_spent > budget.amount:
-                        overage = total_spent - budget.amount
-                        alert_message = f"Warning: You have exceeded your budget for this category by ${overage:,.2f}."
-                        budget_status = "over"
-                    elif total_spent / budget.amount >= 0.8:
-                        alert_message = "Warning: You have used 80% or more of your budget for this category."
-                        budget_status = "near"
-
-            return {"expense": new_expense, "alert": alert_message, "budget_status": budget_status}
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create expense: {e}") from e
-    return await asyncio.to_thread(_create)
+        return _created_results(db, [write], ids)[0]
+    return await run_db(db, _create)
+
+async def import_expenses(db: Session, user: User, stream: BinaryIO, fmt: str) -> dict:
+    def _import():
+        category_ids = set(db.execute(select(Category.id).filter(Category.user_id == user.id)).scalars())
+        errors = []
+        imported = 0
+        touched = set()
+        batch = []
+
+        def _flush():
+            if not batch:
+                return 0
+            try:
+                insert_expenses(db, [
+                    ExpenseWrite(user.id, item.amount, item.date, item.note, item.category_id) for _, item in batch
+                ])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                errors.extend({"line": line, "error": f"Batch insert failed: {e}"} for line, _ in batch)
+                return 0
+            touched.update((item.category_id, month_of(item.date)) for _, item in batch if item.category_id)
+            return len(batch)
+
+        for line, record, error in IMPORT_FORMATS[fmt](stream):
+            if error:
+                errors.append({"line": line, "error": error})
+                continue
+            try:
+                item = ExpenseIn.model_validate(record)
+            except ValidationError as e:
+                errors.append({"line": line, "error": "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+                )})
+                continue
+            if item.category_id is not None and item.category_id not in category_ids:
+                errors.append({"line": line, "error": f"category_id: Category {item.category_id} not found"})
+                continue
+
+            batch.append((line, item))
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                imported += _flush()
+                batch.clear()
+        imported += _flush()
+
+        alerts = _budget_alerts(db, user.id, touched)
+        return {
+            "imported": imported,
+            "failed": len(errors),
+            "errors": errors,
+            "budget_alerts": [
+                {"category_id": category_id, "month": month, "alert": alert, "budget_status": budget_status}
+                for (category_id, month), (alert, budget_status) in sorted(alerts.items())
+                if budget_status
+            ]
+        }
+    return await run_db(db, _import)
+
+def _export_statement(user: User, category_id: Optional[int], start_date: Optional[date], end_date: Optional[date]):
+    stmt = select(
+        Expense.id,
+        Expense.date,
+        Expense.amount,
+        Expense.category_id,
+        Category.name.label("category_name"),
+        Expense.note
+    ).outerjoin(Category, Category.id == Expense.category_id).filter(Expense.user_id == user.id)
+
+    if category_id:
+        stmt = stmt.filter(Expense.category_id == category_id)
+    if start_date:
+        stmt = stmt.filter(Expense.date >= start_date)
+    if end_date:
+        stmt = stmt.filter(Expense.date <= end_date)
+    return stmt.order_by(Expense.date, Expense.id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+def export_expenses(
+    user: User,
+    fmt: str,
+    category_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> StreamingResponse:
+    # The request session is closed before the body streams, so the export opens its own.
+    stmt = _export_statement(user, category_id, start_date, end_date)
+
+    if AsyncSessionLocal is not None:
+        async def _stream():
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(stmt)
+                if fmt == "csv":
+                    yield csv_header()
+                render = csv_chunk if fmt == "csv" else ndjson_chunk
+                async for rows in result.partitions():
+                    yield render(rows)
+        body = _stream()
+    else:
+        def _stream():
+            with SessionLocal() as session:
+                yield from encode_export(fmt, session.execute(stmt).partitions())
+        body = _stream()
+
+    filename = f"expenses.{'csv' if fmt == 'csv' else 'ndjson'}"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[fmt], headers={"Content-Disposition": f"attachment; filename={filename}"})
 
 async def update_expense(db: Session, user: User, expense_id: int, amount: float, date_: date, note: str | None, category_id: int | None):
     def _update():
@@ -119,14 +397,16 @@ async def update_expense(db: Session, user: User, expense_id: int, amount: float
         if not expense:
             raise HTTPException(status_code=404, detail="Expense not found")
 
+        before = ExpenseSnapshot.of(expense)
         expense.amount = amount
         expense.date = date_
         expense.note = note
         expense.category_id = category_id
+        record_expenses(db, user.id, added=[ExpenseSnapshot.of(expense)], removed=[before])
         db.commit()
         db.refresh(expense)
         return expense
-    return await asyncio.to_thread(_update)
+    return await run_db(db, _update)
 
 async def delete_expense(db: Session, user: User, expense_id: int):
     def _delete():
@@ -134,7 +414,8 @@ async def delete_expense(db: Session, user: User, expense_id: int):
         if not expense:
             raise HTTPException(status_code=404, detail="Expense not found")
         
+        record_expenses(db, user.id, removed=[ExpenseSnapshot.of(expense)])
         db.delete(expense)
         db.commit()
         return {"message": "Expense deleted successfully"}
-    return await asyncio.to_thread(_delete)
\ No newline at end of file
+    return await run_db(db, _delete)
\ No newline at end of file
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from config.database import SessionLocal, db_executor, run_db
+from config.settings import settings
+from controllers.expense_controller import ExpenseWrite, insert_expenses
+from models.category import Category
+from models.recurring_expense import RecurringExpense
+from models.recurring_occurrence import RecurringOccurrence
+from models.user import User
+from schemas.recurring_schema import RecurringExpenseIn
+from utils.id_allocator import id_allocator
+from utils.schedules import due_occurrences, first_occurrence
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_COLUMNS = (
+    RecurringExpense.id, RecurringExpense.user_id, RecurringExpense.category_id, RecurringExpense.amount,
+    RecurringExpense.note, RecurringExpense.frequency, RecurringExpense.every, RecurringExpense.day_of_month,
+    RecurringExpense.end_date, RecurringExpense.next_due
+)
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def _materialize_batch(db: Session, schedules: list, today: date) -> int:
+    """Materialize the occurrences of ``schedules`` due by ``today`` and commit.
+
+    Whatever the number of users, this is one batched expense INSERT (plus one upsert per rollup
+    table), one batched occurrence INSERT and one UPDATE advancing ``next_due``. Occurrences already
+    on record are skipped, so a re-run books nothing twice. If a concurrent run (another worker)
+    records one of them first, the occurrence primary key rejects the whole batch with IntegrityError.
+    """
+    due = {}
+    for schedule in schedules:
+        due[schedule.id] = due_occurrences(
+            schedule.frequency, schedule.next_due, today, schedule.every,
+            schedule.day_of_month, schedule.end_date, settings.RECURRING_CATCHUP_LIMIT
+        )
+
+    recorded = set(db.execute(select(RecurringOccurrence.recurring_id, RecurringOccurrence.occurrence_date).filter(
+        RecurringOccurrence.recurring_id.in_(due),
+        RecurringOccurrence.occurrence_date >= min(schedule.next_due for schedule in schedules),
+        RecurringOccurrence.occurrence_date <= today
+    )).all())
+    pending = [
+        (schedule, occurrence)
+        for schedule in schedules
+        for occurrence in due[schedule.id][0]
+        if (schedule.id, occurrence) not in recorded
+    ]
+
+    try:
+        if pending:
+            expense_ids = insert_expenses(db, [
+                ExpenseWrite(schedule.user_id, schedule.amount, occurrence, schedule.note, schedule.category_id)
+                for schedule, occurrence in pending
+            ])
+            db.execute(insert(RecurringOccurrence), [
+                {"recurring_id": schedule.id, "occurrence_date": occurrence, "expense_id": expense_id}
+                for (schedule, occurrence), expense_id in zip(pending, expense_ids)
+            ])
+        db.execute(update(RecurringExpense).where(RecurringExpense.id.in_(due)).values(
+            next_due=case({schedule_id: next_due for schedule_id, (_, next_due) in due.items()}, value=RecurringExpense.id),
+            updated_at=datetime.now(timezone.utc)
+        ).execution_options(synchronize_session=False))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(pending)
+
+def materialize_due(db: Session, today: date | None = None, batch_size: int = settings.RECURRING_BATCH_SIZE) -> int:
+    """Book every recurring expense occurrence due by ``today`` for all users; returns how many were created.
+
+    Schedules are walked in id order, ``batch_size`` per transaction. Every app worker runs this
+    (and cron may too), so a batch that conflicts with an overlapping run is skipped and the walk
+    continues; anything that batch left unbooked is picked up by the next run.
+    """
+    today = today or _today()
+    created = 0
+    last_id = 0
+    while True:
+        schedules = db.execute(select(*SCHEDULE_COLUMNS).filter(
+            RecurringExpense.next_due <= today,
+            RecurringExpense.id > last_id
+        ).order_by(RecurringExpense.id).limit(batch_size)).all()
+        if not schedules:
+            return created
+        try:
+            created += _materialize_batch(db, schedules, today)
+        except IntegrityError:
+            logger.warning("Skipped %s recurring schedules booked by an overlapping run", len(schedules), exc_info=True)
+        last_id = schedules[-1].id
+
+async def materialize_periodically(interval: float):
+    """Background loop for the app: materialize due occurrences every ``interval`` seconds."""
+    def _run():
+        with SessionLocal() as db:
+            return materialize_due(db)
+
+    while True:
+        try:
+            await db_executor.run(_run)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Materializing recurring expenses failed; retrying in %ss", interval)
+        await asyncio.sleep(interval)
+
+async def create_recurring_expense(db: Session, user: User, body: RecurringExpenseIn) -> dict:
+    def _create():
+        if body.category_id is not None:
+            category = db.execute(select(Category.id).filter(
+                Category.id == body.category_id,
+                Category.user_id == user.id
+            )).scalar()
+            if category is None:
+                raise HTTPException(status_code=404, detail="Category not found")
+
+        weekday = body.weekday
+        day_of_month = body.day_of_month
+        if body.frequency == "weekly":
+            weekday = body.start_date.weekday() if weekday is None else weekday
+        else:
+            day_of_month = day_of_month or body.start_date.day
+        next_due = first_occurrence(body.frequency, body.start_date, weekday, day_of_month)
+        if body.end_date is not None and next_due > body.end_date:
+            raise HTTPException(status_code=400, detail="The schedule has no occurrence before end_date")
+
+        try:
+            schedule_id = id_allocator.next_id(db, "recurring_expenses")
+            now = datetime.now(timezone.utc)
+            db.execute(insert(RecurringExpense).values(
+                id=schedule_id, user_id=user.id, category_id=body.category_id, amount=body.amount,
+                note=body.note, frequency=body.frequency, every=body.every, weekday=weekday,
+                day_of_month=day_of_month, start_date=body.start_date, end_date=body.end_date,
+                next_due=next_due, created_at=now, updated_at=now
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to create recurring expense: {e}") from e
+
+        # Occurrences already due (a start date today or in the past) are booked right away.
+        today = _today()
+        materialized = 0
+        if next_due <= today:
+            schedules = db.execute(select(*SCHEDULE_COLUMNS).filter(RecurringExpense.id == schedule_id)).all()
+            materialized = _materialize_batch(db, schedules, today)
+
+        schedule = db.execute(select(RecurringExpense).filter(RecurringExpense.id == schedule_id)).scalar_one()
+        return {"recurring_expense": schedule, "materialized": materialized}
+    return await run_db(db, _create)
+
+async def list_recurring_expenses(db: Session, user: User) -> dict:
+    def _list():
+        schedules = db.execute(select(RecurringExpense).filter(
+            RecurringExpense.user_id == user.id
+        ).order_by(RecurringExpense.id)).scalars().all()
+        return {"title": "Recurring Expenses", "data": schedules}
+    return await run_db(db, _list)
+
+async def delete_recurring_expense(db: Session, user: User, recurring_id: int) -> dict:
+    """Stop a schedule; expenses it already booked are kept."""
+    def _delete():
+        owned = db.execute(select(RecurringExpense.id).filter(
+            RecurringExpense.id == recurring_id,
+            RecurringExpense.user_id == user.id
+        )).scalar()
+        if owned is None:
+            raise HTTPException(status_code=404, detail="Recurring expense not found")
+        db.execute(delete(RecurringOccurrence).where(RecurringOccurrence.recurring_id == recurring_id))
+        db.execute(delete(RecurringExpense).where(RecurringExpense.id == recurring_id))
+        db.commit()
+        return {"message": "Recurring expense deleted successfully"}
+    return await run_db(db, _delete)
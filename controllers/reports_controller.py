@@ -1,52 +1,94 @@
-import asyncio
 import csv
+import math
 import io
-import pandas as pd
+from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text, select
-from models.expense import Expense
+from config.database import run_db, run_in_session
+from sqlalchemy import func, literal, select, union_all
 from models.user import User
 from models.category import Category
+from config.settings import settings
+from models.monthly_spend import MonthlySpend, UNCATEGORIZED
+from utils.months import parse_month, shift_month
+from utils.report_cache import report_cache
+from utils.expense_store import expense_store
+from utils.singleflight import single_flight
+
+UNCATEGORIZED_NAME = "Uncategorized"
+
+def _valid_month(month: str) -> str:
+    # Validated before choosing between the expense store and SQL, so both see the same month.
+    try:
+        return parse_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Month must be in YYYY-MM format") from e
+
+async def _cached_report(user: User, month: str, kind: str, build) -> tuple[dict, str]:
+    cached = report_cache.get(user.id, month, kind)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation(user.id)
+
+    async def _build():
+        return report_cache.put(user.id, month, kind, await run_in_session(build), generation)
+
+    # Identical misses in flight at once (several devices, retries) share one query. The generation
+    # is part of the key, so a request arriving after a committed write never gets an older result.
+    # The shared call outlives a cancelled caller, so it runs on its own session rather than the
+    # request's, which get_db closes when that caller goes away.
+    return await single_flight.do(f"report.{kind}", (user.id, month, generation), _build)
 
 async def monthly_reports(db: Session, user: User, month: str):
-    def _report():
-        if db.bind.url.get_backend_name() == "sqlite":
-            date_filter = func.strftime('%Y-%m', Expense.date) == month
-        else:
-            date_filter = func.to_char(Expense.date, 'YYYY-MM') == month
-
-        query_result = db.execute(select(
-            func.coalesce(func.sum(Expense.amount), 0),
-            func.coalesce(func.count(Expense.id), 0) # pylint: disable=not-callable
-        ).filter(
-            Expense.user_id == user.id,
-            date_filter
-        )).one()
+    report, _ = await monthly_report_with_etag(db, user, month)
+    return report
 
-        total_amount = float(query_result[0] or 0)
-        transaction_count = int(query_result[1] or 0)
+def _month_spend(user: User, month: str):
+    return (MonthlySpend.user_id == user.id) & (MonthlySpend.month == month)
 
-        average_transaction = total_amount / transaction_count if transaction_count > 0 else 0
+def _summary(month: str, total_amount: float, transaction_count: int, ranked: list[tuple[str, float]]) -> dict:
+    average_transaction = total_amount / transaction_count if transaction_count > 0 else 0
+    return {
+        "month": month,
+        "total_expenses": total_amount,
+        "total_transactions": transaction_count,
+        "average_transaction_amount": round(average_transaction, 2),
+        "top_spending_categories": [{"category": name, "total_spent": total} for name, total in ranked[:5]]
+    }
 
-        top_categories_query = db.execute(select(
-            Category.name,
-            func.sum(Expense.amount).label('total_spent')
-        ).join(Expense, Expense.category_id == Category.id).filter(
-            Expense.user_id == user.id,
-            date_filter
-        ).group_by(Category.name).order_by(func.sum(Expense.amount).desc()).limit(5)).all()
-
-        top_categories = [{"category": name, "total_spent": float(total)} for name, total in top_categories_query]
-
-        return {
-            "month": month,
-            "total_expenses": total_amount,
-            "total_transactions": transaction_count,
-            "average_transaction_amount": round(average_transaction, 2),
-            "top_spending_categories": top_categories
-        }
-    return await asyncio.to_thread(_report)
+async def monthly_report_with_etag(db: Session, user: User, month: str) -> tuple[dict, str]:
+    month = _valid_month(month)
+
+    def _report(db: Session):
+        columns = expense_store.columns(db, user.id)
+        if columns is not None:
+            spend = sorted(columns.totals(month, month), key=lambda row: -row[2])
+            return _summary(
+                month,
+                sum(row[2] for row in spend) / 100,
+                sum(row[3] for row in spend),
+                [(columns.names.get(category_id) or UNCATEGORIZED_NAME, total / 100) for _, category_id, total, _ in spend]
+            )
+
+        # One statement: per-category rows ranked by spend, with the month's grand totals
+        # computed alongside by window functions so both come from the same snapshot.
+        rows = db.execute(select(
+            func.coalesce(Category.name, UNCATEGORIZED_NAME).label("category"),
+            MonthlySpend.total,
+            func.sum(MonthlySpend.total).over().label("grand_total"),
+            func.sum(MonthlySpend.count).over().label("grand_count")
+        ).outerjoin(Category, Category.id == MonthlySpend.category_id).filter(
+            _month_spend(user, month),
+            MonthlySpend.count > 0
+        ).order_by(MonthlySpend.total.desc())).all()
+
+        return _summary(
+            month,
+            float(rows[0].grand_total) if rows else 0.0,
+            int(rows[0].grand_count) if rows else 0,
+            [(row.category, float(row.total)) for row in rows]
+        )
+    return await _cached_report(user, month, "summary", _report)
 
 async def generate_monthly_report_csv(db: Session, user: User, month: str):
     report_data = await monthly_reports(db, user, month)
@@ -93,53 +135,79 @@ async def generate_monthly_by_category_report_csv(db: Session, user: User, month
     return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": f"attachment; filename=monthly_report_by_category_{month}.csv"})
 
 async def monthly_reports_by_category(db: Session, user: User, month: str):
-    def _report_by_category():
-        if db.bind.url.get_backend_name() == "sqlite":
-            date_filter = func.strftime('%Y-%m', Expense.date) == month
-            total_monthly_amount = db.execute(select(func.coalesce(func.sum(Expense.amount), 0)).filter(
-                Expense.user_id == user.id,
-                date_filter
-            )).scalar()
-        else:
-            date_filter = func.to_char(Expense.date, 'YYYY-MM') == month
-            total_monthly_amount = db.execute(
-                text("SELECT COALESCE(SUM(amount), 0) FROM expenses WHERE user_id=:uid AND to_char(date, 'YYYY-MM')=:m"),
-                {"uid": user.id, "m": month}
-            ).scalar_one()
-        
-        total_monthly_amount = float(total_monthly_amount or 0)
+    report, _ = await monthly_report_by_category_with_etag(db, user, month)
+    return report
 
-        results = db.execute(select(
+def _breakdown(month: str, total_monthly_amount: float, rows: list[tuple[int, str, float, int]]) -> dict:
+    report_by_category = {}
+    for category_id, name, category_total, transaction_count in rows:
+        percentage = (category_total / total_monthly_amount * 100) if total_monthly_amount > 0 else 0
+        report_by_category[str(category_id)] = {
+            "category_name": name,
+            "total_amount": category_total,
+            "transaction_count": transaction_count,
+            "percentage_of_total_expenses": round(percentage, 2)
+        }
+
+    return {
+        "month": month,
+        "total_monthly_expenses": total_monthly_amount,
+        "breakdown_by_category": report_by_category
+    }
+
+async def monthly_report_by_category_with_etag(db: Session, user: User, month: str) -> tuple[dict, str]:
+    month = _valid_month(month)
+
+    def _report_by_category(db: Session):
+        columns = expense_store.columns(db, user.id)
+        if columns is not None:
+            spend = {category_id: (total, count) for _, category_id, total, count in columns.totals(month, month)}
+            breakdown = [(category_id, name, *spend.get(category_id, (0, 0))) for category_id, name in columns.names.items()]
+            if UNCATEGORIZED in spend:
+                breakdown.append((UNCATEGORIZED, UNCATEGORIZED_NAME, *spend[UNCATEGORIZED]))
+            breakdown.sort(key=lambda row: (row[0] == UNCATEGORIZED, row[1]))
+            return _breakdown(
+                month,
+                sum(total for total, _ in spend.values()) / 100,
+                [(category_id, name, total / 100, count) for category_id, name, total, count in breakdown]
+            )
+
+        categorized = select(
             Category.id,
             Category.name,
-            func.coalesce(func.sum(Expense.amount), 0).label("total_amount"),
-            func.coalesce(func.count(Expense.id), 0).label("transaction_count") # pylint: disable=not-callable
+            func.coalesce(MonthlySpend.total, 0).label("total_amount"),
+            func.coalesce(MonthlySpend.count, 0).label("transaction_count")
+        ).outerjoin(MonthlySpend, (MonthlySpend.category_id == Category.id) & _month_spend(user, month)).filter(
+            Category.user_id == user.id
         )
-        .outerjoin(Expense, (Expense.category_id == Category.id) & (Expense.user_id == user.id) & date_filter)
-        .filter(Category.user_id == user.id)
-        .group_by(Category.id, Category.name)
-        .order_by(Category.name)
-        ).all()
-
-        report_by_category = {}
-        for r in results:
-            category_total = float(r.total_amount)
-            percentage = (category_total / total_monthly_amount * 100) if total_monthly_amount > 0 else 0
-            report_by_category[r.id] = {
-                "category_name": r.name,
-                "total_amount": category_total,
-                "transaction_count": r.transaction_count,
-                "percentage_of_total_expenses": round(percentage, 2)
-            }
+        uncategorized = select(
+            MonthlySpend.category_id,
+            literal(UNCATEGORIZED_NAME),
+            MonthlySpend.total,
+            MonthlySpend.count
+        ).filter(
+            _month_spend(user, month),
+            MonthlySpend.category_id == UNCATEGORIZED,
+            MonthlySpend.count > 0
+        )
+        breakdown = union_all(categorized, uncategorized).subquery()
 
-        return {
-            "month": month,
-            "total_monthly_expenses": total_monthly_amount,
-            "breakdown_by_category": report_by_category
-        }
-    return await asyncio.to_thread(_report_by_category)
+        # The grand total rides along on every row, so the breakdown and the total share one snapshot.
+        results = db.execute(select(
+            breakdown,
+            func.sum(breakdown.c.total_amount).over().label("grand_total")
+        ).order_by(breakdown.c.id == UNCATEGORIZED, breakdown.c.name)).all()
+
+        return _breakdown(
+            month,
+            float(results[0].grand_total or 0) if results else 0.0,
+            [(r.id, r.name, float(r.total_amount), r.transaction_count) for r in results]
+        )
+    return await _cached_report(user, month, "by_category", _report_by_category)
 
 async def generate_monthly_report_csv2(db: Session, user: User, month: str):
+    import pandas as pd
+
     report_data = await monthly_reports(db, user, month)
     main_data = [
         ['Month', report_data['month']],
@@ -161,6 +229,8 @@ async def generate_monthly_report_csv2(db: Session, user: User, month: str):
     return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": f"attachment; filename=monthly_report_{month}_csv2.csv"})
 
 async def generate_monthly_by_category_report_csv2(db: Session, user: User, month: str):
+    import pandas as pd
+
     report_data = await monthly_reports_by_category(db, user, month)
     main_data = [
         ['Month', report_data['month']],
@@ -177,3 +247,110 @@ async def generate_monthly_by_category_report_csv2(db: Session, user: User, mont
         output.write('No category breakdown found\n')
     output.seek(0)
     return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": f"attachment; filename=monthly_report_by_category_{month}_csv2.csv"})
+
+def _month_range(from_month: str, to_month: str) -> list[str]:
+    months = [from_month]
+    while months[-1] < to_month:
+        months.append(shift_month(months[-1], 1))
+    return months
+
+def _percentages(values) -> list:
+    return [None if math.isnan(value) else round(float(value), 2) for value in values]
+
+def _trend_matrices(rows: list, months: list[str]) -> tuple:
+    """Dense month x category total and count matrices over ``months``, plus category names."""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=["month", "category_id", "category_name", "total", "count"])
+    names = {
+        category_id: name or UNCATEGORIZED_NAME
+        for category_id, name in zip(frame["category_id"], frame["category_name"])
+    }
+    totals = frame.pivot(index="month", columns="category_id", values="total").astype(float)
+    counts = frame.pivot(index="month", columns="category_id", values="count")
+    return totals.reindex(months).fillna(0.0), counts.reindex(months).fillna(0).astype(int), names
+
+async def trend_report(db: Session, user: User, from_month: str, to_month: str) -> dict:
+    # pandas/numpy take most of this module's import time, so load them on first use.
+    import numpy as np
+
+    try:
+        from_month, to_month = parse_month(from_month), parse_month(to_month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Months must be in YYYY-MM format") from e
+    if from_month > to_month:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    report_months = _month_range(from_month, to_month)
+    if len(report_months) > settings.TREND_MAX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Trend reports cover at most {settings.TREND_MAX_MONTHS} months")
+
+    # Twelve months before the range are loaded too, so every reported month has both deltas.
+    history_start = shift_month(from_month, -12)
+
+    def _rows():
+        columns = expense_store.columns(db, user.id)
+        if columns is not None:
+            return [
+                (month, category_id, columns.names.get(category_id), total / 100, count)
+                for month, category_id, total, count in columns.totals(history_start, to_month)
+            ]
+        return db.execute(select(
+            MonthlySpend.month,
+            MonthlySpend.category_id,
+            Category.name,
+            func.sum(MonthlySpend.total),
+            func.sum(MonthlySpend.count)
+        ).outerjoin(Category, Category.id == MonthlySpend.category_id).filter(
+            MonthlySpend.user_id == user.id,
+            MonthlySpend.month >= history_start,
+            MonthlySpend.month <= to_month
+        ).group_by(MonthlySpend.month, MonthlySpend.category_id, Category.name)).all()
+
+    rows = await run_db(db, _rows)
+    totals, counts, names = _trend_matrices(rows, _month_range(history_start, to_month))
+
+    month_totals = totals.sum(axis=1)
+    mom = month_totals.diff()
+    yoy = month_totals - month_totals.shift(12)
+    previous, last_year = month_totals.shift(1).to_numpy(), month_totals.shift(12).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mom_pct = np.where(previous > 0, mom.to_numpy() / previous * 100, np.nan)
+        yoy_pct = np.where(last_year > 0, yoy.to_numpy() / last_year * 100, np.nan)
+
+    window = slice(len(totals) - len(report_months), None)
+    mom_pct, yoy_pct = _percentages(mom_pct[window]), _percentages(yoy_pct[window])
+    category_ids = sorted(names, key=lambda category_id: (category_id == UNCATEGORIZED, names[category_id]))
+    totals, counts = totals[category_ids].round(2), counts[category_ids]
+    category_mom = totals.diff().round(2).iloc[window]
+    category_yoy = (totals - totals.shift(12)).round(2).iloc[window]
+    totals, counts = totals.iloc[window], counts.iloc[window]
+
+    return {
+        "from_month": from_month,
+        "to_month": to_month,
+        "months": [
+            {
+                "month": month,
+                "total_amount": round(float(month_totals[month]), 2),
+                "transaction_count": int(counts.loc[month].sum()),
+                "month_over_month_change": round(float(mom[month]), 2),
+                "month_over_month_percentage": mom_pct[i],
+                "year_over_year_change": round(float(yoy[month]), 2),
+                "year_over_year_percentage": yoy_pct[i],
+                "categories": [
+                    {
+                        "category_id": int(category_id),
+                        "category_name": names[category_id],
+                        "total_amount": float(total),
+                        "transaction_count": int(count),
+                        "month_over_month_change": float(change),
+                        "year_over_year_change": float(yearly),
+                    }
+                    for category_id, total, count, change, yearly in zip(
+                        category_ids, totals.loc[month], counts.loc[month], category_mom.loc[month], category_yoy.loc[month]
+                    )
+                ]
+            }
+            for i, month in enumerate(report_months)
+        ]
+    }
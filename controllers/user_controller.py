@@ -1,17 +1,78 @@
-import asyncio
+from typing import Optional
 from sqlalchemy.orm import Session
+from config.database import AsyncSessionLocal, SessionLocal, run_db
+from config.settings import settings
 from sqlalchemy import select
 from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
 from models.user import User
+from utils.filters import prefix_match
+from utils.pagination import InvalidCursor, decode_cursor, keyset_paginate, keyset_predicate
+from utils.responses import dump_json
+
+USER_ORDER = ((User.id, False),)
 
 def me(user: User) -> User:
     return user
 
-async def get_all_users(db: Session) -> dict:
+def _users_statement(email_prefix: Optional[str], name_prefix: Optional[str]):
+    stmt = select(User.id, User.email, User.name)
+    if email_prefix:
+        stmt = stmt.filter(prefix_match(User.email, email_prefix))
+    if name_prefix:
+        stmt = stmt.filter(prefix_match(User.name, name_prefix))
+    return stmt
+
+def _user_item(row) -> dict:
+    return {**row._asdict(), "is_active": True}
+
+async def get_all_users(
+    db: Session,
+    per_page: int = 50,
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None
+) -> dict:
+    """One page of users in id order, as plain dicts ready for TrustedJSONResponse."""
     def _get_all():
-        users = db.execute(select(User)).scalars().all()
-        return {"title": "All Users", "data": users}
-    return await asyncio.to_thread(_get_all)
+        try:
+            rows, next_cursor = keyset_paginate(db, _users_statement(email_prefix, name_prefix), USER_ORDER, cursor, per_page)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        return {"title": "All Users", "data": [_user_item(row) for row in rows], "next_cursor": next_cursor}
+    return await run_db(db, _get_all)
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(dump_json(_user_item(row)) + b"\n" for row in rows)
+
+def stream_users(
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None
+) -> StreamingResponse:
+    """Every matching user (after ``cursor``, if given) as NDJSON, fetched ``EXPORT_BATCH_SIZE`` rows at a time."""
+    stmt = _users_statement(email_prefix, name_prefix)
+    if cursor:
+        try:
+            stmt = stmt.filter(keyset_predicate(USER_ORDER, decode_cursor(cursor, USER_ORDER)))
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    stmt = stmt.order_by(User.id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+    # Like the expense export, the stream outlives the request session and opens its own.
+    if AsyncSessionLocal is not None:
+        async def _stream():
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(stmt)
+                async for rows in result.partitions():
+                    yield _ndjson_chunk(rows)
+    else:
+        def _stream():
+            with SessionLocal() as session:
+                for rows in session.execute(stmt).partitions():
+                    yield _ndjson_chunk(rows)
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
 
 async def get_user_by_id(db: Session, user_id: int) -> dict:
     def _get_by_id():
@@ -19,4 +80,4 @@ async def get_user_by_id(db: Session, user_id: int) -> dict:
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return {"title": "User Details", "data": user}
-    return await asyncio.to_thread(_get_by_id)
+    return await run_db(db, _get_by_id)
@@ -1,26 +1,67 @@
+import asyncio
 from fastapi import FastAPI
-from config.database import init_db
+from fastapi.responses import PlainTextResponse
+from config.database import db_executor, init_db, pool_stats, warm_pool
+from config.settings import settings
+from controllers.expense_controller import expense_writes
+from controllers.recurring_controller import materialize_periodically
+from middleware.metrics import MetricsMiddleware
+from middleware.rate_limit import RateLimitMiddleware
+from utils.metrics import registry, slow_queries
+from utils.security import password_hasher
 from routes.auth_routes import router as auth_router
 from routes.user_routes import router as user_router
 from routes.category_routes import router as category_router
 from routes.expense_routes import router as expense_router
 from routes.budget_routes import router as budget_router
 from routes.reports_routes import router as reports_router
+from routes.recurring_routes import router as recurring_router
 
 app = FastAPI(title="Personal Finance Tracker (PFT)",
               version="1.0.0")
 
+# Metrics wraps rate limiting so rejected requests are still counted.
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    await warm_pool()
+    if settings.RECURRING_MATERIALIZE_INTERVAL_SECONDS > 0:
+        app.state.recurring_task = asyncio.create_task(
+            materialize_periodically(settings.RECURRING_MATERIALIZE_INTERVAL_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    recurring_task = getattr(app.state, "recurring_task", None)
+    if recurring_task is not None:
+        recurring_task.cancel()
+    await expense_writes.drain()
+    password_hasher.shutdown()
+    db_executor.shutdown()
 
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the Personal Finance Tracker API"}
 
+@app.get("/health/db")
+async def read_db_health():
+    return pool_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow-queries", include_in_schema=False)
+async def read_slow_queries():
+    return {"threshold_seconds": slow_queries.threshold, "samples": slow_queries.samples()}
+
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(user_router, prefix="/users", tags=["users"])
 app.include_router(category_router, prefix="/categories", tags=["categories"])
 app.include_router(expense_router, prefix="/expenses", tags=["expenses"])
 app.include_router(budget_router, prefix="/budgets", tags=["budgets"])
 app.include_router(reports_router, prefix="/reports", tags=["reports"])
+app.include_router(recurring_router, prefix="/recurring-expenses", tags=["recurring"])
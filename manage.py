@@ -0,0 +1,60 @@
+import argparse
+from datetime import date
+from config.database import SessionLocal
+from config.settings import settings
+
+def rebuild_rollups(args):
+    from utils.rollups import rebuild_monthly_spend
+
+    with SessionLocal() as db:
+        rows = rebuild_monthly_spend(db, args.user_id, args.month)
+    print(f"Rebuilt monthly spend rollup: {rows} rows")
+
+def rebuild_category_totals(args):
+    from utils.rollups import rebuild_category_totals as rebuild
+
+    with SessionLocal() as db:
+        rows = rebuild(db, args.user_id)
+    print(f"Rebuilt category totals: {rows} rows")
+
+def rebuild_search_index(args):
+    from utils.expense_search import rebuild_expense_terms
+
+    with SessionLocal() as db:
+        rows = rebuild_expense_terms(db, args.user_id)
+    print(f"Rebuilt expense search index: {rows} terms")
+
+def materialize_recurring(args):
+    from controllers.recurring_controller import materialize_due
+
+    with SessionLocal() as db:
+        created = materialize_due(db, args.today, args.batch_size)
+    print(f"Materialized recurring expenses: {created} occurrences")
+
+def main():
+    parser = argparse.ArgumentParser(description="Personal Finance Tracker maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute the monthly spend rollup from expenses")
+    rebuild.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rows")
+    rebuild.add_argument("--month", default=None, help="Only rebuild this month (YYYY-MM)")
+    rebuild.set_defaults(handler=rebuild_rollups)
+
+    totals = commands.add_parser("rebuild-category-totals", help="Recompute lifetime per-category totals from expenses")
+    totals.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rows")
+    totals.set_defaults(handler=rebuild_category_totals)
+
+    search = commands.add_parser("rebuild-search-index", help="Re-index expense notes for GET /expenses/search")
+    search.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's terms")
+    search.set_defaults(handler=rebuild_search_index)
+
+    recurring = commands.add_parser("materialize-recurring", help="Book all due recurring expense occurrences")
+    recurring.add_argument("--today", type=date.fromisoformat, default=None, help="Treat this date (YYYY-MM-DD) as today")
+    recurring.add_argument("--batch-size", type=int, default=settings.RECURRING_BATCH_SIZE, help="Schedules per transaction")
+    recurring.set_defaults(handler=materialize_recurring)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
-import asyncio
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import event, select
+from utils.cache import TTLCache
 from utils.security import decode_access_token
-from config.database import get_db
+from config.database import get_db, run_db
+from config.settings import settings
 from models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Users resolved from a token subject (email), shared by all requests in this process.
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(email: str):
+    principal_cache.pop(email)
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(mapper, connection, target):
+    invalidate_principal(target.email)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -28,12 +39,24 @@ async def get_current_user(
     except Exception as e:
         raise credentials_exception from e
 
+    if settings.AUTH_TOKEN_EMBEDS_USER and payload.get("uid") is not None:
+        return User(id=payload["uid"], email=email, name=payload.get("name"))
+
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
+
     def _get_user():
         result = db.execute(select(User).where(User.email == email))
         return result.scalars().first()
 
-    user = await asyncio.to_thread(_get_user)
+    user = await run_db(db, _get_user)
 
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    principal_cache.set(email, user)
+    return user
+
+def require_admin(user: User):
+    if user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -0,0 +1,42 @@
+import time
+from config.settings import settings
+from utils.metrics import RequestStats, current_request, http_latency, http_requests, request_db_time, request_statements
+
+class MetricsMiddleware:
+    """Records per-route latency, status and SQL work, optionally reporting it in ``Server-Timing``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def _send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.METRICS_SERVER_TIMING:
+                    timing = (
+                        f"total;dur={(time.perf_counter() - started) * 1000:.1f}, "
+                        f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.statements} statements\", "
+                        f"queue;dur={stats.queue_wait_seconds * 1000:.1f}"
+                    )
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route, method = stats.route, scope["method"]
+            http_requests.inc(route, method, status_code)
+            http_latency.observe(time.perf_counter() - started, route, method)
+            request_statements.observe(stats.statements, route)
+            request_db_time.observe(stats.db_seconds, route)
+            current_request.reset(token)
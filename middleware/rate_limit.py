@@ -0,0 +1,79 @@
+from starlette.responses import JSONResponse
+from config.settings import settings
+from utils.metrics import registry
+from utils.rate_limit import ConcurrencyLimiter, RateLimitBackend, load_backend, retry_after
+from utils.security import decode_access_token
+
+# Routes whose requests scan or stream many rows; they also share the concurrency limiter.
+EXPENSIVE_PREFIXES = ("/reports", "/expenses/export", "/expenses/import", "/expenses/search")
+EXEMPT_PATHS = ("/", "/metrics", "/metrics/slow-queries", "/health/db", "/docs", "/redoc", "/openapi.json")
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+rate_limited = registry.counter(
+    "http_rate_limited_total", "Requests rejected with 429 by route class and reason", ("route_class", "reason")
+)
+
+def route_class(method: str, path: str) -> str:
+    if path.startswith(EXPENSIVE_PREFIXES):
+        return "expensive"
+    return "write" if method in WRITE_METHODS else "read"
+
+def _client_key(scope) -> str:
+    """Token subject when the request carries a valid bearer token (the user get_current_user resolves), else client address."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                payload = decode_access_token(token.strip())
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+class RateLimitMiddleware:
+    """Per-client token buckets per route class, plus a process-wide cap on concurrent expensive requests.
+
+    Rejected requests get 429 with ``Retry-After`` before reaching auth or the database. The
+    concurrency slot is held until the response body is fully sent, so streamed exports count.
+    """
+
+    def __init__(self, app, backend: RateLimitBackend | None = None):
+        self.app = app
+        self.backend = backend or load_backend(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_MAX_KEYS)
+        self.limits = {
+            "read": (settings.RATE_LIMIT_READ_PER_SECOND, settings.RATE_LIMIT_READ_BURST),
+            "write": (settings.RATE_LIMIT_WRITE_PER_SECOND, settings.RATE_LIMIT_WRITE_BURST),
+            "expensive": (settings.RATE_LIMIT_EXPENSIVE_PER_SECOND, settings.RATE_LIMIT_EXPENSIVE_BURST),
+        }
+        self.expensive = ConcurrencyLimiter(settings.EXPENSIVE_MAX_CONCURRENCY, settings.EXPENSIVE_QUEUE_TIMEOUT_SECONDS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        kind = route_class(scope["method"], scope["path"])
+        rate, burst = self.limits[kind]
+        wait = await self.backend.acquire(f"{kind}:{_client_key(scope)}", rate, burst)
+        if wait > 0:
+            rate_limited.inc(kind, "rate")
+            await self._reject(scope, receive, send, wait, "Too many requests, please slow down")
+            return
+
+        if kind != "expensive":
+            await self.app(scope, receive, send)
+            return
+        if not await self.expensive.acquire():
+            rate_limited.inc(kind, "concurrency")
+            await self._reject(scope, receive, send, 1, "Server is busy with other reports and exports, please retry shortly")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.expensive.release()
+
+    @staticmethod
+    async def _reject(scope, receive, send, wait: float, detail: str):
+        response = JSONResponse({"detail": detail}, status_code=429, headers={"Retry-After": retry_after(wait)})
+        await response(scope, receive, send)
@@ -0,0 +1,44 @@
+"""monthly spend rollup and hi-lo id block tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of models.monthly_spend.UNCATEGORIZED as of this revision.
+_UNCATEGORIZED = 0
+
+
+def upgrade():
+    op.create_table(
+        "monthly_spend",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category_id", sa.Integer, primary_key=True),
+        sa.Column("month", sa.String(7), primary_key=True),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    month = "strftime('%Y-%m', date)" if op.get_bind().dialect.name == "sqlite" else "to_char(date, 'YYYY-MM')"
+    op.execute(
+        "INSERT INTO monthly_spend (user_id, category_id, month, total, count) "
+        f"SELECT user_id, COALESCE(category_id, {_UNCATEGORIZED}), {month}, SUM(amount), COUNT(id) FROM expenses "
+        f"GROUP BY user_id, COALESCE(category_id, {_UNCATEGORIZED}), {month}"
+    )
+    op.create_table(
+        "id_blocks",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("next_value", sa.BigInteger, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("id_blocks")
+    op.drop_table("monthly_spend")
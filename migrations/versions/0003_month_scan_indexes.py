@@ -0,0 +1,33 @@
+"""composite indexes / clustering keys for month-scoped expense and budget queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "snowflake":
+        op.execute("ALTER TABLE expenses CLUSTER BY (user_id, date)")
+        op.execute("ALTER TABLE budgets CLUSTER BY (user_id, month)")
+        return
+    op.create_index("ix_expenses_user_date", "expenses", ["user_id", "date"])
+    op.create_index("ix_expenses_user_category_date", "expenses", ["user_id", "category_id", "date"])
+    op.create_index("ix_budgets_user_month", "budgets", ["user_id", "month"])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "snowflake":
+        op.execute("ALTER TABLE expenses DROP CLUSTERING KEY")
+        op.execute("ALTER TABLE budgets DROP CLUSTERING KEY")
+        return
+    op.drop_index("ix_budgets_user_month", table_name="budgets")
+    op.drop_index("ix_expenses_user_category_date", table_name="expenses")
+    op.drop_index("ix_expenses_user_date", table_name="expenses")
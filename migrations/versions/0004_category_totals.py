@@ -0,0 +1,33 @@
+"""lifetime per-category expense totals
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "category_totals",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    op.execute(
+        "INSERT INTO category_totals (user_id, category_id, total, count) "
+        "SELECT user_id, category_id, SUM(amount), COUNT(id) FROM expenses "
+        "WHERE category_id IS NOT NULL GROUP BY user_id, category_id"
+    )
+
+
+def downgrade():
+    op.drop_table("category_totals")
@@ -0,0 +1,47 @@
+"""recurring expense schedules and their materialized occurrences
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "recurring_expenses",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("note", sa.String(255), nullable=True),
+        sa.Column("frequency", sa.String(10), nullable=False),
+        sa.Column("every", sa.Integer, nullable=False),
+        sa.Column("weekday", sa.Integer, nullable=True),
+        sa.Column("day_of_month", sa.Integer, nullable=True),
+        sa.Column("start_date", sa.Date, nullable=False),
+        sa.Column("end_date", sa.Date, nullable=True),
+        sa.Column("next_due", sa.Date, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "recurring_occurrences",
+        sa.Column("recurring_id", sa.Integer, sa.ForeignKey("recurring_expenses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("occurrence_date", sa.Date, primary_key=True),
+        sa.Column("expense_id", sa.Integer, sa.ForeignKey("expenses.id", ondelete="SET NULL"), nullable=True),
+    )
+    if op.get_bind().dialect.name != "snowflake":
+        op.create_index("ix_recurring_expenses_next_due", "recurring_expenses", ["next_due"])
+
+
+def downgrade():
+    op.drop_table("recurring_occurrences")
+    op.drop_table("recurring_expenses")
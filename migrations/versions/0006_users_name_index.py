@@ -0,0 +1,26 @@
+"""index for user name prefix filtering
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Snowflake has no secondary indexes; prefix filters there are served by pruning a full scan.
+    if op.get_bind().dialect.name == "snowflake":
+        return
+    op.create_index("ix_users_name", "users", ["name"])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "snowflake":
+        return
+    op.drop_index("ix_users_name", table_name="users")
@@ -0,0 +1,53 @@
+"""inverted index over expense notes for search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of utils.expense_search.tokenize as of this revision.
+_TOKEN = re.compile(r"\w+")
+
+
+def _terms(note):
+    tokens = (token[:32] for token in _TOKEN.findall(note.lower()))
+    return dict.fromkeys(token for token in tokens if len(token) > 1)
+
+
+def upgrade():
+    terms = op.create_table(
+        "expense_terms",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("term", sa.String(32), primary_key=True),
+        sa.Column("expense_id", sa.Integer, sa.ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True),
+    )
+    bind = op.get_bind()
+    if bind.dialect.name == "snowflake":
+        op.execute("ALTER TABLE expense_terms CLUSTER BY (user_id, term)")
+
+    expenses = sa.table("expenses", sa.column("id"), sa.column("user_id"), sa.column("note"))
+    result = bind.execute(
+        sa.select(expenses.c.user_id, expenses.c.id, expenses.c.note).where(expenses.c.note.is_not(None))
+        .execution_options(yield_per=1000)
+    )
+    for rows in result.partitions():
+        batch = [
+            {"user_id": user_id, "term": term, "expense_id": expense_id}
+            for user_id, expense_id, note in rows
+            for term in _terms(note)
+        ]
+        if batch:
+            bind.execute(terms.insert(), batch)
+
+
+def downgrade():
+    op.drop_table("expense_terms")
@@ -3,5 +3,11 @@ from .user import User
 from .category import Category
 from .expense import Expense
 from .budget import Budget
+from .monthly_spend import MonthlySpend
+from .id_block import IdBlock
+from .category_total import CategoryTotal
+from .recurring_expense import RecurringExpense
+from .recurring_occurrence import RecurringOccurrence
+from .expense_term import ExpenseTerm
 
-__all__ = ["Base", "User", "Category", "Expense", "Budget"]
+__all__ = ["Base", "User", "Category", "Expense", "Budget", "MonthlySpend", "IdBlock", "CategoryTotal", "RecurringExpense", "RecurringOccurrence", "ExpenseTerm"]
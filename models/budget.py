@@ -1,10 +1,14 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, ForeignKey, Numeric, String, DateTime, func
-from models.base import Base
+from sqlalchemy import Integer, ForeignKey, Numeric, String, DateTime, Index, func
+from models.base import Base, skip_on_snowflake
 from datetime import datetime
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        Index("ix_budgets_user_month", "user_id", "month").ddl_if(callable_=skip_on_snowflake),
+        {"snowflake_clusterby": ["user_id", "month"]},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -0,0 +1,13 @@
+from decimal import Decimal
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, ForeignKey, Numeric
+from models.base import Base
+
+class CategoryTotal(Base):
+    """Lifetime expense total and count per (user, category), kept in step with every expense write."""
+    __tablename__ = "category_totals"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id: Mapped[int] = mapped_column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
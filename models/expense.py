@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, ForeignKey, Numeric, String, DateTime, func
-from models.base import Base
+from sqlalchemy import Integer, ForeignKey, Numeric, String, DateTime, Index, func
+from models.base import Base, skip_on_snowflake
 from datetime import datetime
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_date", "user_id", "date").ddl_if(callable_=skip_on_snowflake),
+        Index("ix_expenses_user_category_date", "user_id", "category_id", "date").ddl_if(callable_=skip_on_snowflake),
+        {"snowflake_clusterby": ["user_id", "date"]},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
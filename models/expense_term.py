@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Integer, String
+from models.base import Base
+
+class ExpenseTerm(Base):
+    """Inverted index over expense notes: one row per distinct token of each note.
+
+    The (user_id, term) key prefix serves prefix lookups; rows follow every expense write.
+    """
+    __tablename__ = "expense_terms"
+    __table_args__ = {"snowflake_clusterby": ["user_id", "term"]}
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    term: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expense_id: Mapped[int] = mapped_column(Integer, ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,10 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, String
+from models.base import Base
+
+class IdBlock(Base):
+    """High-water mark per table for the hi-lo ID allocator on dialects without sequences."""
+    __tablename__ = "id_blocks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    next_value: Mapped[int] = mapped_column(BigInteger, nullable=False)
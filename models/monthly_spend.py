@@ -0,0 +1,19 @@
+from decimal import Decimal
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, ForeignKey, Numeric, String
+from models.base import Base
+
+UNCATEGORIZED = 0
+
+class MonthlySpend(Base):
+    """Per (user, category, month) rollup of expenses, kept in step with every expense write.
+
+    Uncategorized spend is stored under category_id ``UNCATEGORIZED`` so the key stays non-null.
+    """
+    __tablename__ = "monthly_spend"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=UNCATEGORIZED)
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)  # "YYYY-MM"
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,30 @@
+from decimal import Decimal
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, func
+from models.base import Base, skip_on_snowflake
+from datetime import date, datetime
+
+class RecurringExpense(Base):
+    """Schedule rule for an expense that repeats every ``every`` weeks or months.
+
+    ``next_due`` is the first occurrence not yet materialized; ``None`` once the schedule has ended.
+    """
+    __tablename__ = "recurring_expenses"
+    __table_args__ = (
+        Index("ix_recurring_expenses_next_due", "next_due").ddl_if(callable_=skip_on_snowflake),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    frequency: Mapped[str] = mapped_column(String(10), nullable=False)  # "weekly" | "monthly"
+    every: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    weekday: Mapped[int | None] = mapped_column(Integer, nullable=True)  # 0 = Monday, weekly rules
+    day_of_month: Mapped[int | None] = mapped_column(Integer, nullable=True)  # monthly rules
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    next_due: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now()) # pylint: disable=not-callable
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=func.now()) # pylint: disable=not-callable
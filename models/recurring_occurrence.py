@@ -0,0 +1,12 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, ForeignKey, Integer
+from models.base import Base
+from datetime import date
+
+class RecurringOccurrence(Base):
+    """One materialized occurrence of a recurring expense; the key makes materialization idempotent."""
+    __tablename__ = "recurring_occurrences"
+
+    recurring_id: Mapped[int] = mapped_column(Integer, ForeignKey("recurring_expenses.id", ondelete="CASCADE"), primary_key=True)
+    occurrence_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    expense_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("expenses.id", ondelete="SET NULL"), nullable=True)
@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, func, Identity
-from models.base import Base
+from sqlalchemy import String, Integer, DateTime, func, Identity, Index
+from models.base import Base, skip_on_snowflake
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_name", "name").ddl_if(callable_=skip_on_snowflake),
+    )
 
     id: Mapped[int] = mapped_column(Integer, Identity(start=1, increment=1), primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
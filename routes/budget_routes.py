@@ -3,9 +3,10 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from config.database import get_db
 from middleware.auth import get_current_user
-from controllers.budget_controller import create_budget, get_budget, list_budgets, update_budget, delete_budget
+from controllers.budget_controller import budget_status, create_budget, get_budget, list_budgets, update_budget, delete_budget
 from models.user import User
-from schemas.budget_schema import Budget as BudgetSchema, BudgetDictResponse, AllBudgetsResponse
+from utils.responses import TrustedJSONResponse
+from schemas.budget_schema import Budget as BudgetSchema, BudgetDictResponse, AllBudgetsResponse, BudgetStatusResponse
 
 router = APIRouter()
 
@@ -24,12 +25,16 @@ async def edit_budget(budget_id: int, body: BudgetIn, current_user: User = Depen
 
 @router.get("/", response_model=AllBudgetsResponse)
 async def read_all_budgets(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return await list_budgets(db, current_user)
+    return TrustedJSONResponse(await list_budgets(db, current_user))
 
 @router.get("/{month}", response_model=BudgetDictResponse)
 async def read_budget(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     return await get_budget(db, current_user, month)
 
+@router.get("/{month}/status", response_model=BudgetStatusResponse)
+async def read_budget_status(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return TrustedJSONResponse(await budget_status(db, current_user, month))
+
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_budget(budget_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     await delete_budget(db, current_user, budget_id)
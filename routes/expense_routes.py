@@ -1,22 +1,16 @@
 from datetime import date
-from typing import Optional
-from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session
 from config.database import get_db
 from middleware.auth import get_current_user
-from controllers.expense_controller import list_expenses, create_expense, delete_expense
+from controllers.expense_controller import list_expenses, create_expense, delete_expense, import_expenses, export_expenses, search_expenses
 from models.user import User
-from schemas.expense_schema import ExpenseResponse
+from utils.responses import TrustedJSONResponse
+from schemas.expense_schema import ExpenseIn, ExpenseResponse, ExpenseImportResponse
 
 router = APIRouter()
 
-class ExpenseIn(BaseModel):
-    amount: float = Field(gt=0)
-    date: date
-    note: str | None = Field(default=None, max_length=255)
-    category_id: int | None = None
-
 @router.get("", response_model=ExpenseResponse)
 async def get_expenses(
     page: int = Query(1, ge=1), 
@@ -24,15 +18,56 @@ async def get_expenses(
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over page"),
+    include_total: bool = Query(True, description="Set to false to skip counting all matching expenses"),
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
-    return await list_expenses(db, current_user, page, per_page, category_id, start_date, end_date)
+    return TrustedJSONResponse(await list_expenses(db, current_user, page, per_page, category_id, start_date, end_date, cursor, include_total))
+
+@router.get("/search", response_model=ExpenseResponse)
+async def search_expense_notes(
+    q: str = Query(..., min_length=1, max_length=255, description="Words to look for in notes; each matches as a prefix"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    include_total: bool = Query(True, description="Set to false to skip counting all matches"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return TrustedJSONResponse(await search_expenses(db, current_user, q, page, per_page, category_id, start_date, end_date, include_total))
 
 @router.post("")
 async def add_expense(body: ExpenseIn, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     return await create_expense(db, current_user, body.amount, body.date, body.note, body.category_id)
 
+@router.post("/import", response_model=ExpenseImportResponse)
+async def import_expense_file(
+    file: UploadFile = File(..., description="CSV with a header row, or JSON Lines, with amount, date, note and category_id"),
+    format: Optional[Literal["csv", "jsonl"]] = Query(None, description="Defaults to the file extension"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    fmt = format
+    if fmt is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        fmt = {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Could not detect the file format; pass ?format=csv or ?format=jsonl")
+    return await import_expenses(db, current_user, file.file, fmt)
+
+@router.get("/export")
+async def export_expense_ledger(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    current_user: User = Depends(get_current_user)
+):
+    return export_expenses(current_user, format, category_id, start_date, end_date)
+
 @router.delete("/{expense_id}")
 async def remove_expense(expense_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     return await delete_expense(db, current_user, expense_id)
\ No newline at end of file
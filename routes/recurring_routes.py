@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from config.database import get_db
+from middleware.auth import get_current_user
+from controllers.recurring_controller import create_recurring_expense, list_recurring_expenses, delete_recurring_expense
+from models.user import User
+from schemas.recurring_schema import RecurringExpenseIn, RecurringExpenseCreated, RecurringExpenseList
+
+router = APIRouter()
+
+@router.get("", response_model=RecurringExpenseList)
+async def get_recurring_expenses(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return await list_recurring_expenses(db, current_user)
+
+@router.post("", response_model=RecurringExpenseCreated, status_code=status.HTTP_201_CREATED)
+async def add_recurring_expense(body: RecurringExpenseIn, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return await create_recurring_expense(db, current_user, body)
+
+@router.delete("/{recurring_id}")
+async def remove_recurring_expense(recurring_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return await delete_recurring_expense(db, current_user, recurring_id)
@@ -1,17 +1,44 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from config.database import get_db
 from middleware.auth import get_current_user
-from controllers.reports_controller import monthly_reports, monthly_reports_by_category, generate_monthly_report_csv, generate_monthly_by_category_report_csv
+from controllers.reports_controller import (
+    monthly_report_with_etag, monthly_report_by_category_with_etag,
+    generate_monthly_report_csv, generate_monthly_by_category_report_csv, trend_report
+)
 from models.user import User
-from schemas.report_schema import MonthlyReport, MonthlyReportByCategory
+from schemas.report_schema import MonthlyReport, MonthlyReportByCategory, TrendReport
+from utils.report_cache import etag_matches
 
 router = APIRouter()
 
+def _conditional(report: dict, etag: str, if_none_match: str | None, response: Response):
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return report
+
+@router.get("/trend", response_model=TrendReport)
+async def get_trend_report(
+    from_month: str = Query(..., alias="from", description="First month (YYYY-MM)"),
+    to_month: str = Query(..., alias="to", description="Last month (YYYY-MM)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return await trend_report(db, current_user, from_month, to_month)
+
 @router.get("/summary/{month}", response_model=MonthlyReport)
-async def get_reports_summary(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return await monthly_reports(db, current_user, month)
+async def get_reports_summary(
+    month: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    report, etag = await monthly_report_with_etag(db, current_user, month)
+    return _conditional(report, etag, if_none_match, response)
 
 @router.get("/summary/{month}/csv", response_class=StreamingResponse)
 async def get_reports_summary_csv(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -23,8 +50,15 @@ async def get_reports_summary_csv2(month: str, current_user: User = Depends(get_
     return await generate_monthly_report_csv2(db, current_user, month)
 
 @router.get("/summary-by-category/{month}", response_model=MonthlyReportByCategory)
-async def get_reports_summary_by_category(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return await monthly_reports_by_category(db, current_user, month)
+async def get_reports_summary_by_category(
+    month: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    report, etag = await monthly_report_by_category_with_etag(db, current_user, month)
+    return _conditional(report, etag, if_none_match, response)
 
 @router.get("/summary-by-category/{month}/csv", response_class=StreamingResponse)
 async def get_reports_summary_by_category_csv(month: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from config.database import get_db
-from middleware.auth import get_current_user
-from controllers.user_controller import me, get_all_users, get_user_by_id
+from middleware.auth import get_current_user, require_admin
+from controllers.user_controller import me, get_all_users, get_user_by_id, stream_users
 from models.user import User
+from utils.responses import TrustedJSONResponse
 from schemas.user_schema import User as UserSchema, UserListResponse, UserDetailResponse
 
 router = APIRouter()
 
 @router.get("/", response_model=UserListResponse)
-async def read_users(db: Session = Depends(get_db)):
-    return await get_all_users(db)
+async def read_users(
+    per_page: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    email_prefix: Optional[str] = Query(None, min_length=1, max_length=255, description="Case-sensitive email prefix"),
+    name_prefix: Optional[str] = Query(None, min_length=1, max_length=120, description="Case-sensitive name prefix"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every matching user instead of one page (admins only)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if format == "ndjson":
+        require_admin(current_user)
+        return stream_users(cursor, email_prefix, name_prefix)
+    return TrustedJSONResponse(await get_all_users(db, per_page, cursor, email_prefix, name_prefix))
 
 @router.get("/me", response_model=UserSchema)
 def get_me(current_user: User = Depends(get_current_user)):
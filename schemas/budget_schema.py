@@ -29,3 +29,21 @@ class BudgetDictResponse(RootModel):
 
 class AllBudgetsResponse(RootModel):
     root: dict[str, dict[int, Budget]]
+
+class BudgetCategoryStatus(BaseModel):
+    category_id: int
+    category_name: str
+    amount: float
+    spent: float
+    remaining: float = Field(description="Negative once the budget is exceeded")
+    percentage: float
+    alert_level: Optional[int] = Field(None, description="Highest usage threshold reached: 80, 90 or 100")
+    budget_status: Optional[str] = None
+    alert: Optional[str] = None
+
+class BudgetStatusResponse(BaseModel):
+    month: str
+    total_budget: float
+    total_spent: float
+    total_remaining: float
+    categories: list[BudgetCategoryStatus]
@@ -11,6 +11,7 @@ class Category(CategoryBase):
     id: int
     user_id: int
     total_expenses_formatted: Optional[str] = Field(None, alias="total_expenses")
+    current_month_expenses: Optional[str] = None
     current_month_budget: Optional[str] = None
 
     class Config:
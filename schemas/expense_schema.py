@@ -1,7 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
 from typing import List, Optional
 
+class ExpenseIn(BaseModel):
+    amount: float = Field(gt=0)
+    date: date
+    note: str | None = Field(default=None, max_length=255)
+    category_id: int | None = None
+
 class ExpenseBase(BaseModel):
     amount: float
     date: date
@@ -21,11 +27,28 @@ class ExpenseInDB(ExpenseBase):
         from_attributes = True
 
 class PaginatedExpenseResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
     items: List[ExpenseInDB]
+    next_cursor: Optional[str] = None
 
 class ExpenseResponse(BaseModel):
     title: str
     data: PaginatedExpenseResponse
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportBudgetAlert(BaseModel):
+    category_id: int
+    month: str
+    alert: str
+    budget_status: str
+
+class ExpenseImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    budget_alerts: List[ImportBudgetAlert]
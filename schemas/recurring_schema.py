@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+class RecurringExpenseIn(BaseModel):
+    amount: float = Field(gt=0)
+    note: str | None = Field(default=None, max_length=255)
+    category_id: int | None = None
+    frequency: Literal["weekly", "monthly"]
+    every: int = Field(default=1, ge=1, le=52, description="Repeat every N weeks or months")
+    weekday: int | None = Field(default=None, ge=0, le=6, description="Weekly rules: 0 = Monday; defaults to start_date's weekday")
+    day_of_month: int | None = Field(default=None, ge=1, le=31, description="Monthly rules: clamped to short months; defaults to start_date's day")
+    start_date: date
+    end_date: date | None = None
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if self.frequency == "weekly" and self.day_of_month is not None:
+            raise ValueError("day_of_month only applies to monthly schedules")
+        if self.frequency == "monthly" and self.weekday is not None:
+            raise ValueError("weekday only applies to weekly schedules")
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+class RecurringExpense(BaseModel):
+    id: int
+    user_id: int
+    category_id: Optional[int] = None
+    amount: float
+    note: Optional[str] = None
+    frequency: str
+    every: int
+    weekday: Optional[int] = None
+    day_of_month: Optional[int] = None
+    start_date: date
+    end_date: Optional[date] = None
+    next_due: Optional[date] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class RecurringExpenseCreated(BaseModel):
+    recurring_expense: RecurringExpense
+    materialized: int
+
+class RecurringExpenseList(BaseModel):
+    title: str
+    data: List[RecurringExpense]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class TopCategory(BaseModel):
     category: str
@@ -22,3 +22,26 @@ class MonthlyReportByCategory(BaseModel):
     month: str
     total_monthly_expenses: float
     breakdown_by_category: Dict[str, CategoryBreakdown]
+
+class TrendCategory(BaseModel):
+    category_id: int
+    category_name: str
+    total_amount: float
+    transaction_count: int
+    month_over_month_change: Optional[float] = None
+    year_over_year_change: Optional[float] = None
+
+class TrendMonth(BaseModel):
+    month: str
+    total_amount: float
+    transaction_count: int
+    month_over_month_change: Optional[float] = None
+    month_over_month_percentage: Optional[float] = None
+    year_over_year_change: Optional[float] = None
+    year_over_year_percentage: Optional[float] = None
+    categories: List[TrendCategory]
+
+class TrendReport(BaseModel):
+    from_month: str
+    to_month: str
+    months: List[TrendMonth]
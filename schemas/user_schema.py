@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 
@@ -10,7 +11,8 @@ class UserCreate(UserBase):
 
 class User(UserBase):
     id: int
-    is_active: bool
+    # Accounts cannot be deactivated yet; the field is kept for API compatibility.
+    is_active: bool = True
 
     class Config:
         orm_mode = True
@@ -22,6 +24,7 @@ class UserUpdatePassword(BaseModel):
 class UserListResponse(BaseModel):
     title: str
     data: list[User]
+    next_cursor: Optional[str] = None
 
 class UserDetailResponse(BaseModel):
     title: str
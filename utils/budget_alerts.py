@@ -0,0 +1,22 @@
+from config.settings import settings
+
+ALERT_LEVELS = (100, 90, 80)
+
+def usage_percentage(spent, amount) -> float:
+    return float(spent) / float(amount) * 100 if amount else 0.0
+
+def alert_level(spent, amount) -> int | None:
+    """Highest of the 80/90/100% usage thresholds ``spent`` has reached, if any."""
+    percentage = usage_percentage(spent, amount)
+    return next((level for level in ALERT_LEVELS if percentage >= level), None)
+
+def budget_alert(spent, amount) -> tuple[str | None, str | None]:
+    """Alert message and status ("near" below the budget, "over" past it) for a category's spend."""
+    level = alert_level(spent, amount)
+    if level is None:
+        return None, None
+    if spent > amount:
+        return f"Warning: You have exceeded your budget for this category by {settings.CURRENCY_SYMBOL}{spent - amount:,.2f}.", "over"
+    if level == 100:
+        return "Warning: You have used all of your budget for this category.", "near"
+    return f"Warning: You have used {level}% or more of your budget for this category.", "near"
@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, Sequence
+
+EXPORT_COLUMNS = ("id", "date", "amount", "category_id", "category_name", "note")
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def csv_header() -> str:
+    output = io.StringIO()
+    csv.writer(output).writerow(EXPORT_COLUMNS)
+    return output.getvalue()
+
+def csv_chunk(rows: Sequence[tuple]) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row in rows:
+        writer.writerow([row.id, row.date.isoformat(), row.amount, row.category_id, row.category_name, row.note])
+    return output.getvalue()
+
+def ndjson_chunk(rows: Sequence[tuple]) -> str:
+    return "".join(
+        json.dumps({
+            "id": row.id,
+            "date": row.date.isoformat(),
+            "amount": float(row.amount),
+            "category_id": row.category_id,
+            "category_name": row.category_name,
+            "note": row.note,
+        }) + "\n"
+        for row in rows
+    )
+
+def encode_export(fmt: str, partitions: Iterable[Sequence[tuple]]) -> Iterator[str]:
+    """Render row partitions as one text chunk each, so memory is bounded by the partition size."""
+    if fmt == "csv":
+        yield csv_header()
+    render = csv_chunk if fmt == "csv" else ndjson_chunk
+    for rows in partitions:
+        yield render(rows)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator
+
+ImportRecord = tuple[int, dict | None, str | None]
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[ImportRecord]:
+    """Yield (line, record, error) for each CSV row, reading the upload incrementally."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text_stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except (csv.Error, UnicodeDecodeError) as e:
+                yield reader.line_num, None, f"Unreadable CSV row: {e}"
+                if isinstance(e, UnicodeDecodeError):
+                    return
+                continue
+            if None in row:
+                yield reader.line_num, None, "Row has more fields than the header"
+                continue
+            yield reader.line_num, {
+                key.strip().lower(): (value.strip() or None) if value is not None else None
+                for key, value in row.items()
+            }, None
+    finally:
+        text_stream.detach()
+
+def iter_jsonl_records(stream: BinaryIO) -> Iterator[ImportRecord]:
+    """Yield (line, record, error) for each JSON Lines object, reading the upload incrementally."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    try:
+        line_no = 0
+        while True:
+            try:
+                line = text_stream.readline()
+            except UnicodeDecodeError as e:
+                yield line_no + 1, None, f"Unreadable line: {e}"
+                return
+            if not line:
+                return
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+    finally:
+        text_stream.detach()
+
+IMPORT_FORMATS = {
+    "csv": iter_csv_records,
+    "jsonl": iter_jsonl_records,
+}
@@ -0,0 +1,59 @@
+import re
+from typing import Iterable
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from models.expense import Expense
+from models.expense_term import ExpenseTerm
+
+TERM_MAX_LENGTH = 32
+QUERY_MAX_TERMS = 8
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text: str | None) -> list[str]:
+    """Distinct lower-cased word tokens of ``text`` in order, skipping single characters."""
+    if not text:
+        return []
+    tokens = (token[:TERM_MAX_LENGTH] for token in _TOKEN.findall(text.lower()))
+    return list(dict.fromkeys(token for token in tokens if len(token) > 1))
+
+def term_rows(user_id: int, expense_id: int, note: str | None) -> list[dict]:
+    return [{"user_id": user_id, "term": term, "expense_id": expense_id} for term in tokenize(note)]
+
+def index_expense_changes(db: Session, changes: Iterable[tuple]):
+    """Keep ``expense_terms`` in step with (user_id, snapshot, sign) expense changes; the caller commits.
+
+    Removed snapshots drop every term of their expense before added ones are indexed, so an update
+    (old snapshot removed, new one added) re-indexes the note.
+    """
+    removed, added = [], []
+    for user_id, snapshot, sign in changes:
+        if sign < 0:
+            removed.append(snapshot.id)
+        else:
+            added.extend(term_rows(user_id, snapshot.id, snapshot.note))
+    if removed:
+        db.execute(delete(ExpenseTerm).where(ExpenseTerm.expense_id.in_(removed)))
+    if added:
+        db.execute(insert(ExpenseTerm), added)
+
+def rebuild_expense_terms(db: Session, user_id: int | None = None, batch_size: int = 1000) -> int:
+    """Re-index every expense note from the expenses table, optionally for one user, and commit."""
+    source = select(Expense.user_id, Expense.id, Expense.note).filter(Expense.note.is_not(None))
+    purge = delete(ExpenseTerm)
+    if user_id is not None:
+        source = source.filter(Expense.user_id == user_id)
+        purge = purge.where(ExpenseTerm.user_id == user_id)
+
+    indexed = 0
+    try:
+        db.execute(purge)
+        for rows in db.execute(source.execution_options(yield_per=batch_size)).partitions():
+            terms = [term for row in rows for term in term_rows(row.user_id, row.id, row.note)]
+            if terms:
+                db.execute(insert(ExpenseTerm), terms)
+            indexed += len(terms)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return indexed
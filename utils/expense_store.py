@@ -0,0 +1,278 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from config.settings import settings
+from models.category import Category
+from models.expense import Expense
+from utils.cache import TTLCache
+from utils.metrics import registry
+
+_CHANGES_KEY = "expense_store_changes"
+_DROPPED_KEY = "expense_store_dropped"
+_EPOCH = date(1970, 1, 1).toordinal()
+_MISS_KEYS = 10000
+# In place of a miss count: the user's columns did not fit or were evicted, so don't reload them yet.
+_NO_ROOM = object()
+
+store_reads = registry.counter(
+    "expense_store_reads_total", "Report reads by whether the in-memory expense store answered them", ("result",)
+)
+
+def month_index(month: str) -> int:
+    year, month_number = (int(part) for part in month.split("-"))
+    return year * 12 + month_number - 1
+
+def to_cents(amount) -> int:
+    return int((amount if isinstance(amount, Decimal) else Decimal(str(amount))).scaleb(2).to_integral_value())
+
+def _month_indexes(days):
+    import numpy as np
+
+    months = (days.astype(np.int64) - _EPOCH).astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+    return months + 1970 * 12
+
+class UserColumns:
+    """One user's expenses as parallel NumPy columns, plus the user's category names.
+
+    Rows are unordered. Columns grow by doubling so appends are amortized; the first ``size``
+    rows are live. Uncategorized expenses have category 0.
+    """
+    _COLUMNS = ("ids", "days", "months", "categories", "cents")
+
+    def __init__(self, ids, days, categories, cents, names: dict[int, str]):
+        self.ids, self.days, self.categories, self.cents = ids, days, categories, cents
+        self.months = _month_indexes(days)
+        self.size = len(ids)
+        self.names = names
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, column).nbytes for column in self._COLUMNS)
+
+    def _reserve(self, rows: int):
+        import numpy as np
+
+        capacity = len(self.ids)
+        if self.size + rows <= capacity:
+            return
+        capacity = max(2 * capacity, self.size + rows, 16)
+        for column in self._COLUMNS:
+            current = getattr(self, column)
+            grown = np.empty(capacity, dtype=current.dtype)
+            grown[:self.size] = current[:self.size]
+            setattr(self, column, grown)
+
+    def apply(self, upserts: dict[int, tuple[int, int, int]], removed: set[int]):
+        """Drop rows whose id is in ``removed`` or ``upserts``, then append ``upserts`` ((day, category, cents) by id).
+
+        Replacing by id makes applying a change the rows already reflect a no-op.
+        """
+        import numpy as np
+
+        with self._lock:
+            stale = np.isin(self.ids[:self.size], np.fromiter(removed | upserts.keys(), np.int64))
+            if stale.any():
+                keep = ~stale
+                live = int(keep.sum())
+                for column in self._COLUMNS:
+                    values = getattr(self, column)
+                    values[:live] = values[:self.size][keep]
+                self.size = live
+            if not upserts:
+                return
+            self._reserve(len(upserts))
+            end = self.size + len(upserts)
+            self.ids[self.size:end] = np.fromiter(upserts.keys(), np.int64, len(upserts))
+            rows = np.array(list(upserts.values()), dtype=np.int64).reshape(-1, 3)
+            self.days[self.size:end] = rows[:, 0]
+            self.months[self.size:end] = _month_indexes(rows[:, 0])
+            self.categories[self.size:end] = rows[:, 1]
+            self.cents[self.size:end] = rows[:, 2]
+            self.size = end
+
+    def totals(self, from_month: str, to_month: str) -> list[tuple[str, int, int, int]]:
+        """(month, category_id, total cents, count) for every month and category with expenses in the range."""
+        import numpy as np
+
+        first, last = month_index(from_month), month_index(to_month)
+        with self._lock:
+            months = self.months[:self.size]
+            selected = (months >= first) & (months <= last)
+            keys = (months[selected].astype(np.int64) << 32) | self.categories[:self.size][selected]
+            cents = self.cents[:self.size][selected]
+        if not len(keys):
+            return []
+        order = np.argsort(keys, kind="stable")
+        keys, cents = keys[order], cents[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        sums = np.add.reduceat(cents, starts)
+        counts = np.diff(np.r_[starts, len(keys)])
+        return [
+            (f"{month // 12:04d}-{month % 12 + 1:02d}", category_id, total, count)
+            for month, category_id, total, count in zip(
+                (keys[starts] >> 32).tolist(), (keys[starts] & 0xFFFFFFFF).tolist(), sums.tolist(), counts.tolist()
+            )
+        ]
+
+def load_user_columns(db: Session, user_id: int) -> UserColumns:
+    import numpy as np
+
+    ids, days, categories, cents = [], [], [], []
+    rows = db.execute(
+        select(Expense.id, Expense.date, Expense.category_id, Expense.amount).filter(Expense.user_id == user_id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    for expense_id, expense_date, category_id, amount in rows:
+        ids.append(expense_id)
+        days.append(expense_date.toordinal())
+        categories.append(category_id or 0)
+        cents.append(to_cents(amount))
+    names = dict(db.execute(select(Category.id, Category.name).filter(Category.user_id == user_id)).all())
+    return UserColumns(
+        np.array(ids, dtype=np.int64), np.array(days, dtype=np.int32),
+        np.array(categories, dtype=np.int32), np.array(cents, dtype=np.int64), names
+    )
+
+class ExpenseStore:
+    """Per-process columnar copies of the expenses of users whose reports are read often.
+
+    A user is loaded on their ``load_after``-th report read within ``ttl``; entries are evicted
+    least recently used to stay within ``memory_bytes`` and expire after ``ttl``, which bounds
+    staleness from writes made by other processes. Committed writes in this process are applied
+    as they happen. A commit landing while a user is being loaded keeps that load from being stored.
+    Users whose columns exceed the budget or get evicted are not reloaded until ``ttl`` has passed,
+    so memory pressure falls back to SQL instead of repeatedly reading whole expense tables.
+    """
+
+    def __init__(self, enabled: bool, memory_bytes: int, ttl: float, load_after: int):
+        self.enabled = enabled
+        self.memory_bytes = memory_bytes
+        self.ttl = ttl
+        self.load_after = load_after
+        self._entries: OrderedDict[int, tuple[float, UserColumns]] = OrderedDict()
+        self._loading: dict[int, bool] = {}
+        self._misses = TTLCache(_MISS_KEYS, ttl)
+        self._lock = threading.Lock()
+
+    def columns(self, db: Session, user_id: int) -> UserColumns | None:
+        """The user's columns, loading them through ``db`` once the user is hot; None means use SQL."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                store_reads.inc("hit")
+                return entry[1]
+            self._entries.pop(user_id, None)
+            misses = self._misses.get(user_id, 0)
+            if misses is _NO_ROOM or user_id in self._loading:
+                store_reads.inc("miss")
+                return None
+            if misses + 1 < self.load_after:
+                self._misses.set(user_id, misses + 1)
+                store_reads.inc("miss")
+                return None
+            self._misses.pop(user_id)
+            self._loading[user_id] = False
+
+        try:
+            # Each statement sees what was committed before it started, so a commit whose changes
+            # the load misses runs its after_commit hook after _loading was set and marks it dirty.
+            columns = load_user_columns(db, user_id)
+        finally:
+            with self._lock:
+                dirty = self._loading.pop(user_id)
+        store_reads.inc("load")
+        with self._lock:
+            if columns.nbytes > self.memory_bytes:
+                self._misses.set(user_id, _NO_ROOM)
+            elif not dirty:
+                self._entries[user_id] = (time.monotonic() + self.ttl, columns)
+                self._evict()
+        return columns
+
+    def apply(self, changes: Iterable[tuple[int, object, int]], dropped: Iterable[int]):
+        """Fold committed (user_id, snapshot, sign) changes into loaded users and drop ``dropped`` users.
+
+        An expense added in the transaction ends up with its added snapshot, so an update recorded as
+        old row removed and new row added replaces the row.
+        """
+        upserts, removed = defaultdict(dict), defaultdict(set)
+        for user_id, snapshot, sign in changes:
+            if sign > 0:
+                upserts[user_id][snapshot.id] = (snapshot.date.toordinal(), snapshot.category_id or 0, to_cents(snapshot.amount))
+            else:
+                removed[user_id].add(snapshot.id)
+        dropped = set(dropped)
+
+        with self._lock:
+            for user_id in upserts.keys() | removed.keys() | dropped:
+                if user_id in self._loading:
+                    self._loading[user_id] = True
+            for user_id in dropped:
+                self._entries.pop(user_id, None)
+            for user_id in upserts.keys() | removed.keys():
+                entry = self._entries.get(user_id)
+                if entry is not None:
+                    entry[1].apply(upserts.get(user_id, {}), removed.get(user_id, set()) - upserts.get(user_id, {}).keys())
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        used = sum(columns.nbytes for _, columns in self._entries.values())
+        while used > self.memory_bytes and self._entries:
+            user_id, (_, columns) = self._entries.popitem(last=False)
+            self._misses.set(user_id, _NO_ROOM)
+            used -= columns.nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [columns for _, columns in self._entries.values()]
+        return {
+            "users": len(entries),
+            "rows": sum(columns.size for columns in entries),
+            "bytes": sum(columns.nbytes for columns in entries),
+        }
+
+expense_store = ExpenseStore(
+    settings.EXPENSE_STORE_ENABLED,
+    int(settings.EXPENSE_STORE_MEMORY_MB * 2**20),
+    settings.EXPENSE_STORE_TTL_SECONDS,
+    settings.EXPENSE_STORE_LOAD_AFTER,
+)
+
+registry.gauge(
+    "expense_store_state", "Users, rows and bytes held by the in-memory expense store",
+    lambda: {(stat,): value for stat, value in expense_store.stats().items()}, ("stat",)
+)
+
+def stage_expense_changes(db: Session, changes: Iterable[tuple[int, object, int]]):
+    """Apply (user_id, snapshot, sign) expense changes to the store once ``db`` commits."""
+    if expense_store.enabled:
+        db.info.setdefault(_CHANGES_KEY, []).extend(changes)
+
+def drop_expense_columns(db: Session, user_id: int):
+    """Forget the user's columns once ``db`` commits, e.g. after category changes."""
+    if expense_store.enabled:
+        db.info.setdefault(_DROPPED_KEY, set()).add(user_id)
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes, dropped = session.info.pop(_CHANGES_KEY, ()), session.info.pop(_DROPPED_KEY, ())
+    if changes or dropped:
+        expense_store.apply(changes, dropped)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_CHANGES_KEY, None)
+    session.info.pop(_DROPPED_KEY, None)
@@ -0,0 +1,13 @@
+from sqlalchemy import true
+
+def prefix_match(column, prefix: str):
+    """Case-sensitive ``column`` LIKE 'prefix%', plus range bounds a plain btree index can seek on.
+
+    An empty prefix matches every row, so it is a plain TRUE that callers can filter or combine on.
+    """
+    if not prefix:
+        return true()
+    match = (column >= prefix) & column.startswith(prefix, autoescape=True)
+    if ord(prefix[-1]) == 0x10FFFF:
+        return match
+    return match & (column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
@@ -0,0 +1,110 @@
+import threading
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config.settings import settings
+from models.id_block import IdBlock
+
+def _max_id(conn: Connection, table_name: str) -> int:
+    return conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}")).scalar_one()
+
+class TableBlockSource:
+    """Hands out ID blocks by bumping a per-table counter row in ``id_blocks``."""
+
+    def reserve(self, engine: Engine, table_name: str, size: int) -> tuple[int, int]:
+        with engine.begin() as conn:
+            bumped = conn.execute(update(IdBlock).where(IdBlock.name == table_name).values(
+                next_value=IdBlock.next_value + size
+            ))
+            if bumped.rowcount:
+                end = conn.execute(select(IdBlock.next_value).where(IdBlock.name == table_name)).scalar_one()
+                return end - size, size
+
+        try:
+            with engine.begin() as conn:
+                start = _max_id(conn, table_name) + 1
+                conn.execute(insert(IdBlock).values(name=table_name, next_value=start + size))
+                return start, size
+        except IntegrityError:
+            # Another worker seeded the counter first; take a block from it instead.
+            return self.reserve(engine, table_name, size)
+
+class SequenceBlockSource:
+    """Hands out ID blocks from a database sequence whose increment is the block size."""
+
+    def __init__(self):
+        self._increments: dict[tuple[Engine, str], int] = {}
+
+    @staticmethod
+    def _sequence_name(table_name: str) -> str:
+        return f"{table_name}_id_seq"
+
+    def _prepare(self, conn: Connection, table_name: str, size: int) -> int:
+        name = self._sequence_name(table_name)
+        start = _max_id(conn, table_name) + 1
+        if conn.dialect.name == "snowflake":
+            conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name} START = {start} INCREMENT = {size}"))
+            row = conn.execute(text(f"SHOW SEQUENCES LIKE '{name}'")).mappings().first()
+            return int(row["interval"])
+        conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name} START WITH {start} INCREMENT BY {size}"))
+        return conn.execute(
+            text("SELECT increment_by FROM pg_sequences WHERE schemaname = current_schema() AND sequencename = :name"),
+            {"name": name}
+        ).scalar_one()
+
+    def reserve(self, engine: Engine, table_name: str, size: int) -> tuple[int, int]:
+        name = self._sequence_name(table_name)
+        with engine.begin() as conn:
+            increment = self._increments.get((engine, table_name))
+            if increment is None:
+                # An existing sequence keeps the increment it was created with.
+                increment = self._increments[(engine, table_name)] = self._prepare(conn, table_name, size)
+            if conn.dialect.name == "snowflake":
+                start = conn.execute(text(f"SELECT {name}.nextval")).scalar_one()
+            else:
+                start = conn.execute(text(f"SELECT nextval('{name}')")).scalar_one()
+        return start, increment
+
+class IdAllocator:
+    """Process-wide primary key allocator reserving IDs in blocks.
+
+    Blocks are reserved on a separate connection and committed immediately, so a block is
+    never handed out twice even if the caller's transaction rolls back; unused IDs are skipped.
+    """
+    SEQUENCE_DIALECTS = ("snowflake", "postgresql")
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        # Re-entrant because AsyncSession work runs on the event loop thread, where a second
+        # coroutine may allocate while the first awaits its reservation; blocks stay disjoint.
+        self._lock = threading.RLock()
+        self._blocks: dict[tuple[Engine, str], list[int]] = {}
+        self._table_source = TableBlockSource()
+        self._sequence_source = SequenceBlockSource()
+
+    def _source(self, engine: Engine):
+        if engine.dialect.name in self.SEQUENCE_DIALECTS:
+            return self._sequence_source
+        return self._table_source
+
+    def allocate(self, db: Session, table_name: str, count: int = 1) -> list[int]:
+        engine = db.get_bind().engine
+        key = (engine, table_name)
+        ids: list[int] = []
+        with self._lock:
+            while len(ids) < count:
+                block = self._blocks.get(key)
+                if block is None or block[0] >= block[1]:
+                    wanted = max(self.block_size, count - len(ids))
+                    start, size = self._source(engine).reserve(engine, table_name, wanted)
+                    block = self._blocks[key] = [start, start + size]
+                take = min(block[1] - block[0], count - len(ids))
+                ids.extend(range(block[0], block[0] + take))
+                block[0] += take
+        return ids
+
+    def next_id(self, db: Session, table_name: str) -> int:
+        return self.allocate(db, table_name)[0]
+
+id_allocator = IdAllocator(settings.ID_BLOCK_SIZE)
@@ -0,0 +1,193 @@
+import contextvars
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config.settings import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_text(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, _label_text(self.labels, label_values), value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            state = self._values.setdefault(label_values, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        for label_values, state in sorted(values.items()):
+            for bound, count in zip(self.buckets + ("+Inf",), state):
+                yield f"{self.name}_bucket", _label_text(self.labels + ("le",), label_values + (bound,)), count
+            yield f"{self.name}_count", _label_text(self.labels, label_values), state[len(self.buckets)]
+            yield f"{self.name}_sum", _label_text(self.labels, label_values), state[-1]
+
+class Gauge:
+    """Gauge read from ``collect()`` at scrape time, returning {label values: value}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, collect, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels, self.collect = name, help_text, labels, collect
+
+    def samples(self):
+        for label_values, value in sorted(self.collect().items()):
+            yield self.name, _label_text(self.labels, label_values), value
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name: str, help_text: str, collect, labels: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, collect, labels))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value:g}" for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency", ("route", "method"))
+request_statements = registry.histogram(
+    "http_request_db_statements", "SQL statements issued per request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+request_db_time = registry.histogram("http_request_db_seconds", "Time spent executing SQL per request", ("route",))
+db_statements = registry.histogram("db_statement_duration_seconds", "SQL statement execution time")
+slow_statements = registry.counter("db_slow_statements_total", "SQL statements slower than SLOW_QUERY_SECONDS")
+executor_queue_wait = registry.histogram("db_executor_queue_wait_seconds", "Time DB work waited for an executor thread")
+pool_checkout_wait = registry.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+
+@dataclass
+class RequestStats:
+    scope: dict
+    statements: int = 0
+    db_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # Set by routing; path templates rather than raw paths keep label sets bounded.
+        return getattr(self.scope.get("route"), "path", None) or "unmatched"
+
+current_request: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("current_request", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholder lists and whitespace so equivalent statements group together."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+class SlowQueryLog:
+    def __init__(self, threshold: float, size: int):
+        self.threshold = threshold
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, route: str | None):
+        if seconds < self.threshold:
+            return
+        slow_statements.inc()
+        with self._lock:
+            self._samples.append({
+                "sql": normalize_sql(statement),
+                "duration_ms": round(seconds * 1000, 3),
+                "route": route,
+                "at": datetime.now(timezone.utc).isoformat(),
+            })
+
+    def samples(self) -> list[dict]:
+        with self._lock:
+            return list(reversed(self._samples))
+
+slow_queries = SlowQueryLog(settings.SLOW_QUERY_SECONDS, settings.SLOW_QUERY_SAMPLES)
+
+def observe_queue_wait(seconds: float):
+    executor_queue_wait.observe(seconds)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queue_wait_seconds += seconds
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_statements.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    slow_queries.record(statement, elapsed, stats.route if stats else None)
+
+def _handle_error(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine: Engine):
+    """Time every statement on ``engine`` (pass ``async_engine.sync_engine`` for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
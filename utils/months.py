@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+def month_of(value: date) -> str:
+    return value.strftime("%Y-%m")
+
+def parse_month(value: str) -> str:
+    """Validate a "YYYY-MM" month, raising ValueError otherwise."""
+    return datetime.strptime(value, "%Y-%m").strftime("%Y-%m")
+
+def shift_month(month: str, months: int) -> str:
+    year, month_number = (int(part) for part in month.split("-"))
+    year, index = divmod(year * 12 + month_number - 1 + months, 12)
+    return f"{year:04d}-{index + 1:02d}"
+
+def month_bounds(month: str) -> tuple[date, date]:
+    """Half-open ``[first_day, first_day_of_next_month)`` range for a "YYYY-MM" month."""
+    year, month_number = (int(part) for part in month.split("-"))
+    start = date(year, month_number, 1)
+    end = date(year + 1, 1, 1) if month_number == 12 else date(year, month_number + 1, 1)
+    return start, end
+
+def in_month(column, month: str):
+    """Range predicate for ``column`` falling in ``month``; unlike to_char/strftime it can use indexes and pruning."""
+    start, end = month_bounds(month)
+    return and_(column >= start, column < end)
+
+def month_key(db: Session, column):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime('%Y-%m', column)
+    return func.to_char(column, 'YYYY-MM')
@@ -1,6 +1,79 @@
+import base64
+import json
+from datetime import date, datetime
 from typing import Sequence, Any
+from sqlalchemy import and_, or_
 
-def paginate(query, page: int = 1, per_page: int = 20):
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-    return {"total": total, "page": page, "per_page": per_page, "items": items}
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[tuple]) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(payload, list) or len(payload) != len(keys):
+        raise InvalidCursor("Cursor does not match the ordering")
+
+    values = []
+    for (column, _), value in zip(keys, payload):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif value is not None:
+                value = python_type(value)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor("Malformed cursor") from e
+        values.append(value)
+    return values
+
+def keyset_predicate(keys: Sequence[tuple], values: Sequence[Any]):
+    """Rows strictly after ``values`` in the ordering given by ``keys`` ((column, descending) pairs)."""
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[keys[j][0] == values[j] for j in range(i)], step))
+    return or_(*clauses)
+
+def keyset_order(keys: Sequence[tuple]):
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+def _keyset_page(rows: list, keys: Sequence[tuple], per_page: int):
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in keys])
+    return items, next_cursor
+
+def keyset_paginate(db, stmt, keys: Sequence[tuple], cursor: str | None = None, per_page: int = 20):
+    """Run a 2.0-style select one keyset page at a time; returns (items, next_cursor).
+
+    Items are entities for a single-entity select, otherwise rows.
+    """
+    if cursor:
+        stmt = stmt.filter(keyset_predicate(keys, decode_cursor(cursor, keys)))
+    result = db.execute(stmt.order_by(*keyset_order(keys)).limit(per_page + 1))
+    rows = result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+    return _keyset_page(rows, keys, per_page)
+
+def paginate(query, page: int = 1, per_page: int = 20, keys: Sequence[tuple] | None = None, cursor: str | None = None, with_total: bool = True):
+    total = query.count() if with_total else None
+    if keys is None:
+        items = query.offset((page - 1) * per_page).limit(per_page).all()
+        return {"total": total, "page": page, "per_page": per_page, "items": items}
+
+    if cursor:
+        query = query.filter(keyset_predicate(keys, decode_cursor(cursor, keys)))
+    rows = query.order_by(*keyset_order(keys)).limit(per_page + 1).all()
+    items, next_cursor = _keyset_page(rows, keys, per_page)
+    return {"total": total, "per_page": per_page, "items": items, "next_cursor": next_cursor}
@@ -0,0 +1,68 @@
+import asyncio
+import importlib
+import math
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+class RateLimitBackend(Protocol):
+    """Token-bucket store. A shared implementation (e.g. Redis) makes limits hold across workers."""
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token from ``key``'s bucket: 0 if admitted, else seconds until a token is available."""
+        ...
+
+class InMemoryRateLimitBackend:
+    """Per-process buckets, least recently used evicted past ``max_keys`` (an evicted bucket starts full)."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        # Runs on the event loop without awaiting, so no lock is needed.
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+def load_backend(path: str | None, max_keys: int) -> RateLimitBackend:
+    """Backend named by ``path`` ("package.module:attribute", an instance or a zero-argument factory), else in-memory."""
+    if not path:
+        return InMemoryRateLimitBackend(max_keys)
+    module_name, _, attribute = path.partition(":")
+    backend = getattr(importlib.import_module(module_name), attribute)
+    return backend() if isinstance(backend, type) or not hasattr(backend, "acquire") else backend
+
+class ConcurrencyLimiter:
+    """Caps in-flight calls per process; callers wait up to ``timeout`` seconds for a slot."""
+
+    def __init__(self, limit: int, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+def retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from typing import Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config.settings import settings
+from utils.cache import TTLCache
+
+_TOUCHED_KEY = "touched_report_months"
+
+def compute_etag(report: dict) -> str:
+    body = json.dumps(report, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+class ReportCache:
+    """Report payloads and ETags keyed by (user_id, month, kind).
+
+    Entries are dropped when a committed write touches the user's month (or any month for
+    category changes). A per-user generation stops a report computed before such a commit from
+    being stored after it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize, ttl)
+        self._generations: defaultdict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, month: str, kind: str) -> tuple[dict, str] | None:
+        return self._entries.get((user_id, month, kind))
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations[user_id]
+
+    def put(self, user_id: int, month: str, kind: str, report: dict, generation: int) -> tuple[dict, str]:
+        entry = (report, compute_etag(report))
+        with self._lock:
+            if self._generations[user_id] == generation:
+                self._entries.set((user_id, month, kind), entry)
+        return entry
+
+    def invalidate(self, user_id: int, month: str | None = None):
+        with self._lock:
+            self._generations[user_id] += 1
+        self._entries.pop_matching(lambda key: key[0] == user_id and (month is None or key[1] == month))
+
+report_cache = ReportCache(settings.REPORT_CACHE_SIZE, settings.REPORT_CACHE_TTL_SECONDS)
+
+def touch_report_months(db: Session, user_id: int, months: Iterable[str | None]):
+    """Mark the user's cached reports for ``months`` (``None`` = all months) stale once ``db`` commits."""
+    db.info.setdefault(_TOUCHED_KEY, set()).update((user_id, month) for month in months)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id, month in session.info.pop(_TOUCHED_KEY, ()):
+        report_cache.invalidate(user_id, month)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_TOUCHED_KEY, None)
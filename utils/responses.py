@@ -0,0 +1,27 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+class TrustedJSONResponse(JSONResponse):
+    """orjson-encoded response for payloads built server-side from plain rows.
+
+    Returning it from a route skips ``response_model`` validation, so content must already
+    have the documented shape; Decimals become floats and int keys become strings.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+def iso_date(value) -> str:
+    """ISO date for a DATE or midnight DATETIME column value."""
+    return (value.date() if isinstance(value, datetime) else value).isoformat()
@@ -0,0 +1,196 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+from models.category_total import CategoryTotal
+from models.expense import Expense
+from models.expense_term import ExpenseTerm
+from models.monthly_spend import MonthlySpend, UNCATEGORIZED
+from utils.expense_search import index_expense_changes
+from utils.expense_store import stage_expense_changes
+from utils.months import in_month, month_key, month_of
+from utils.report_cache import touch_report_months
+
+_MERGE_SQL: dict[tuple[str, int], text] = {}
+_MERGE_CHUNK = 500
+
+def _merge_sql(table, keys: tuple[str, ...], rows: int):
+    """Snowflake MERGE adding ``rows`` (total, count) deltas to the rows at ``keys``, inserting missing ones."""
+    if (table.name, rows) not in _MERGE_SQL:
+        columns = keys + ("total", "count")
+        values = ", ".join(f"({', '.join(f':{column}_{i}' for column in columns)})" for i in range(rows))
+        _MERGE_SQL[(table.name, rows)] = text(f"""
+            MERGE INTO {table.name} t
+            USING (SELECT {", ".join(f"${n} AS {column}" for n, column in enumerate(columns, 1))} FROM VALUES {values}) s
+            ON {" AND ".join(f"t.{key} = s.{key}" for key in keys)}
+            WHEN MATCHED THEN UPDATE SET total = t.total + s.total, count = t.count + s.count
+            WHEN NOT MATCHED THEN INSERT ({", ".join(columns)})
+                VALUES ({", ".join(f"s.{column}" for column in columns)})
+        """)
+    return _MERGE_SQL[(table.name, rows)]
+
+class ExpenseSnapshot(NamedTuple):
+    id: int
+    category_id: Optional[int]
+    date: date
+    amount: Decimal
+    note: Optional[str] = None
+
+    @classmethod
+    def of(cls, expense: Expense) -> "ExpenseSnapshot":
+        return cls(expense.id, expense.category_id, expense.date, expense.amount, expense.note)
+
+def _to_decimal(amount) -> Decimal:
+    return amount if isinstance(amount, Decimal) else Decimal(str(amount))
+
+def _apply_deltas(db: Session, model, keys: tuple[str, ...], rows: list[dict]):
+    """Add each row's (total, count) to the ``model`` row at its ``keys``, inserting missing rows.
+
+    A single (executemany) upsert on SQLite/PostgreSQL and one MERGE per chunk of rows on Snowflake;
+    keys must be unique within ``rows``.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(model)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[getattr(model, column) for column in keys],
+            set_={"total": model.total + stmt.excluded.total, "count": model.count + stmt.excluded.count}
+        ), rows)
+    elif dialect == "snowflake":
+        for start in range(0, len(rows), _MERGE_CHUNK):
+            chunk = rows[start:start + _MERGE_CHUNK]
+            db.execute(_merge_sql(model.__table__, keys, len(chunk)), {
+                f"{column}_{i}": value for i, row in enumerate(chunk) for column, value in row.items()
+            })
+    else:
+        for row in rows:
+            result = db.execute(update(model).where(
+                *(getattr(model, column) == row[column] for column in keys)
+            ).values(total=model.total + row["total"], count=model.count + row["count"]))
+            if result.rowcount == 0:
+                db.execute(insert(model).values(**row))
+
+def record_expense_changes(db: Session, changes: Iterable[tuple[int, ExpenseSnapshot, int]]):
+    """Fold expense writes for any number of users into the monthly rollup, category totals and note index.
+
+    ``changes`` are (user_id, snapshot, sign) triples, sign 1 for an added row and -1 for a removed
+    one. Each rollup table gets one upsert however many users and months are touched; the caller commits.
+    """
+    changes = list(changes)
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    category_deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for user_id, snapshot, sign in changes:
+        amount = sign * _to_decimal(snapshot.amount)
+        delta = deltas[(user_id, snapshot.category_id or UNCATEGORIZED, month_of(snapshot.date))]
+        delta[0] += amount
+        delta[1] += sign
+        if snapshot.category_id:
+            delta = category_deltas[(user_id, snapshot.category_id)]
+            delta[0] += amount
+            delta[1] += sign
+
+    _apply_deltas(db, MonthlySpend, ("user_id", "category_id", "month"), [
+        {"user_id": user_id, "category_id": category_id, "month": month, "total": total, "count": count}
+        for (user_id, category_id, month), (total, count) in deltas.items()
+        if total != 0 or count != 0
+    ])
+    _apply_deltas(db, CategoryTotal, ("user_id", "category_id"), [
+        {"user_id": user_id, "category_id": category_id, "total": total, "count": count}
+        for (user_id, category_id), (total, count) in category_deltas.items()
+        if total != 0 or count != 0
+    ])
+
+    index_expense_changes(db, changes)
+    stage_expense_changes(db, changes)
+
+    months = defaultdict(set)
+    for user_id, _, month in deltas:
+        months[user_id].add(month)
+    for user_id, user_months in months.items():
+        touch_report_months(db, user_id, user_months)
+
+def record_expenses(
+    db: Session,
+    user_id: int,
+    added: Iterable[ExpenseSnapshot] = (),
+    removed: Iterable[ExpenseSnapshot] = ()
+):
+    """Fold one user's expense writes into the rollups inside the caller's transaction.
+
+    An update is recorded as the old row removed and the new row added; the caller commits.
+    """
+    record_expense_changes(db, [(user_id, s, 1) for s in added] + [(user_id, s, -1) for s in removed])
+
+def forget_category(db: Session, user_id: int, category_id: int):
+    for model in (MonthlySpend, CategoryTotal):
+        db.execute(delete(model).where(
+            model.user_id == user_id,
+            model.category_id == category_id
+        ))
+    # The category's expenses are deleted with it, so their note terms go too.
+    db.execute(delete(ExpenseTerm).where(ExpenseTerm.expense_id.in_(
+        select(Expense.id).where(Expense.user_id == user_id, Expense.category_id == category_id)
+    )))
+
+def rebuild_monthly_spend(db: Session, user_id: int | None = None, month: str | None = None) -> int:
+    """Recompute the rollup from the expenses table, optionally scoped to a user and/or month, and commit."""
+    expense_month = month_key(db, Expense.date)
+    category_id = func.coalesce(Expense.category_id, UNCATEGORIZED)
+
+    source = select(
+        Expense.user_id,
+        category_id,
+        expense_month,
+        func.sum(Expense.amount),
+        func.count(Expense.id) # pylint: disable=not-callable
+    ).group_by(Expense.user_id, category_id, expense_month)
+    purge = delete(MonthlySpend)
+    if user_id is not None:
+        source = source.filter(Expense.user_id == user_id)
+        purge = purge.where(MonthlySpend.user_id == user_id)
+    if month is not None:
+        source = source.filter(in_month(Expense.date, month))
+        purge = purge.where(MonthlySpend.month == month)
+
+    try:
+        db.execute(purge)
+        result = db.execute(insert(MonthlySpend).from_select(
+            ["user_id", "category_id", "month", "total", "count"], source
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount
+
+def rebuild_category_totals(db: Session, user_id: int | None = None) -> int:
+    """Recompute lifetime category totals from the expenses table, optionally for one user, and commit."""
+    source = select(
+        Expense.user_id,
+        Expense.category_id,
+        func.sum(Expense.amount),
+        func.count(Expense.id) # pylint: disable=not-callable
+    ).filter(Expense.category_id.is_not(None)).group_by(Expense.user_id, Expense.category_id)
+    purge = delete(CategoryTotal)
+    if user_id is not None:
+        source = source.filter(Expense.user_id == user_id)
+        purge = purge.where(CategoryTotal.user_id == user_id)
+
+    try:
+        db.execute(purge)
+        result = db.execute(insert(CategoryTotal).from_select(
+            ["user_id", "category_id", "total", "count"], source
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount
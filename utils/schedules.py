@@ -0,0 +1,49 @@
+from calendar import monthrange
+from datetime import date, timedelta
+
+FREQUENCIES = ("weekly", "monthly")
+
+def _on_day(year: int, month: int, day: int) -> date:
+    """``day`` of the month, clamped to its last day (the 31st falls on Feb 28/29, Apr 30, ...)."""
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+def _add_months(value: date, months: int, day: int) -> date:
+    year, index = divmod(value.year * 12 + value.month - 1 + months, 12)
+    return _on_day(year, index + 1, day)
+
+def first_occurrence(frequency: str, start: date, weekday: int | None = None, day_of_month: int | None = None) -> date:
+    """Earliest occurrence on or after ``start``: the next ``weekday`` for weekly rules, the next ``day_of_month`` for monthly ones."""
+    if frequency == "weekly":
+        return start if weekday is None else start + timedelta(days=(weekday - start.weekday()) % 7)
+    day = day_of_month or start.day
+    first = _on_day(start.year, start.month, day)
+    return first if first >= start else _add_months(start, 1, day)
+
+def next_occurrence(frequency: str, due: date, every: int, day_of_month: int | None = None) -> date:
+    """Occurrence following ``due``. Monthly rules keep their day of month, so Jan 31 -> Feb 28 -> Mar 31."""
+    if frequency == "weekly":
+        return due + timedelta(weeks=every)
+    return _add_months(due, every, day_of_month or due.day)
+
+def due_occurrences(
+    frequency: str,
+    next_due: date,
+    until: date,
+    every: int,
+    day_of_month: int | None = None,
+    end_date: date | None = None,
+    limit: int | None = None
+) -> tuple[list[date], date | None]:
+    """Occurrences from ``next_due`` through ``until`` (at most ``limit``), and the one after them.
+
+    The returned next due date is ``None`` once the schedule has passed ``end_date``.
+    """
+    if end_date is not None:
+        until = min(until, end_date)
+    dates = []
+    while next_due <= until and (limit is None or len(dates) < limit):
+        dates.append(next_due)
+        next_due = next_occurrence(frequency, next_due, every, day_of_month)
+    if end_date is not None and next_due > end_date:
+        next_due = None
+    return dates, next_due
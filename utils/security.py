@@ -1,9 +1,19 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from config.settings import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with any other cost factor are flagged by needs_update and rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,6 +21,61 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """Runs bcrypt on its own bounded pool so hashing bursts cannot starve database threads.
+
+    Calls beyond ``max_pending`` (running plus queued) are rejected with 503 instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool = False):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.PASSWORD_HASH_USE_PROCESSES,
+)
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+async def check_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify on the hashing pool; also returns a replacement hash when the stored one uses an outdated cost."""
+    return await password_hasher.run(verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(
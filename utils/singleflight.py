@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from utils.metrics import registry
+
+flight_calls = registry.counter(
+    "singleflight_calls_total", "Reads by whether they executed or joined an identical in-flight call", ("call", "role")
+)
+
+class SingleFlight:
+    """Concurrent calls with the same (name, key) share one execution and its result or exception.
+
+    The shared call runs as its own task, so a caller that is cancelled (e.g. on client disconnect)
+    does not cancel it for the others. Nothing is kept once it finishes; caching is a separate layer.
+    """
+
+    def __init__(self):
+        self._tasks: dict[tuple, asyncio.Task] = {}
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight_key = (name, key)
+        task = self._tasks.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[flight_key] = task
+            task.add_done_callback(lambda done: self._finished(flight_key, done))
+            flight_calls.inc(name, "executed")
+        else:
+            flight_calls.inc(name, "coalesced")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def _finished(self, flight_key: tuple, task: asyncio.Task):
+        if self._tasks.get(flight_key) is task:
+            del self._tasks[flight_key]
+        if not task.cancelled():
+            # Retrieve the exception so it is not reported as unhandled when every caller went away.
+            task.exception()
+
+single_flight = SingleFlight()
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+from fastapi import HTTPException, status
+from utils import metrics
+
+batch_sizes = metrics.registry.histogram(
+    "write_coalescer_batch_size", "Items per coalesced flush", ("name",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)
+)
+
+class WriteCoalescer:
+    """Gathers writes submitted within ``max_wait`` seconds into a single ``flush`` call.
+
+    ``flush`` takes the batched items and returns one result per item, in order; a result that
+    is an exception is raised to that item's caller. A batch is flushed when it reaches
+    ``max_batch`` items or its oldest item has waited ``max_wait``. Submissions beyond
+    ``max_pending`` in flight are rejected with 503 instead of queueing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list], list],
+        run: Callable[..., Awaitable[Any]],
+        max_batch: int,
+        max_wait: float,
+        max_pending: int
+    ):
+        self.name = name
+        self.flush = flush
+        self.run = run
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.pending = 0
+        self._batch: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushing: set[asyncio.Task] = set()
+
+    async def submit(self, item):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many writes in flight, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((item, future))
+        self.pending += 1
+        if len(self._batch) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: list[tuple[Any, asyncio.Future]]):
+        # The batch serves many requests; don't attribute its statements to whichever opened it.
+        metrics.current_request.set(None)
+        batch_sizes.observe(len(batch), self.name)
+        try:
+            results = await self.run(self.flush, [item for item, _ in batch])
+        except Exception as e: # pylint: disable=broad-except
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def drain(self):
+        """Flush anything still batched and wait for in-flight flushes, e.g. at shutdown."""
+        self._dispatch()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)